@@ -68,7 +68,7 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-E
         applied_at TIMESTAMP
     );
 
-    CREATE INDEX idx_metrics_workload_timestamp ON metrics(workload_id, timestamp DESC);
+    CREATE INDEX idx_metrics_workload_timestamp_covering ON metrics(workload_id, timestamp DESC) INCLUDE (cpu_usage_cores, memory_usage_bytes);
     CREATE INDEX idx_cost_estimates_workload_timestamp ON cost_estimates(workload_id, timestamp DESC);
     CREATE INDEX idx_recommendations_workload_status ON recommendations(workload_id, status);
     CREATE INDEX idx_workloads_cluster ON workloads(cluster_id);
@@ -0,0 +1,10 @@
+-- Replace the metrics(workload_id, timestamp DESC) index with a covering one so
+-- the analysis aggregates are answered from the index alone.
+-- Run outside a transaction block: CONCURRENTLY is not allowed inside one.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_metrics_workload_timestamp_covering
+    ON metrics(workload_id, timestamp DESC) INCLUDE (cpu_usage_cores, memory_usage_bytes);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_metrics_workload_timestamp;
+
+ANALYZE metrics;
@@ -79,7 +79,7 @@ CREATE TABLE IF NOT EXISTS optimization_history (
     notes TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_metrics_workload_timestamp ON metrics(workload_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_metrics_workload_timestamp_covering ON metrics(workload_id, timestamp DESC) INCLUDE (cpu_usage_cores, memory_usage_bytes);
 CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON metrics(timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_cost_estimates_workload_timestamp ON cost_estimates(workload_id, timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_recommendations_workload_status ON recommendations(workload_id, status);
@@ -1,12 +1,14 @@
 import os
 import random
-from typing import List
+from typing import List, Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 from models import (
     ResourceUsage,
     PricingResponse,
+    BatchPricingRequest,
+    BatchPricingResponse,
     EstimateRequest,
     EstimateResponse,
     InstanceType,
@@ -118,8 +120,7 @@ async def get_instances():
     return instances
 
 
-@app.post("/pricing", response_model=PricingResponse)
-async def calculate_pricing(usage: ResourceUsage):
+def price_usage(usage: ResourceUsage) -> PricingResponse:
     breakdown = calculate_cost(usage.instance_type, usage)
     hourly_cost = breakdown.total / usage.hours
     monthly_cost = breakdown.total
@@ -136,28 +137,28 @@ async def calculate_pricing(usage: ResourceUsage):
     )
 
 
+@app.post("/pricing", response_model=PricingResponse)
+async def calculate_pricing(usage: ResourceUsage):
+    return price_usage(usage)
+
+
+@app.post("/pricing/batch", response_model=BatchPricingResponse)
+async def calculate_pricing_batch(request: BatchPricingRequest):
+    return BatchPricingResponse(
+        provider=CLOUD_PROVIDER,
+        results=[price_usage(usage) for usage in request.requests]
+    )
+
+
 @app.post("/estimate", response_model=EstimateResponse)
 async def calculate_estimate(request: EstimateRequest):
     breakdown_list = []
     total_monthly = 0.0
 
     for resource in request.resources:
-        breakdown = calculate_cost(resource.instance_type, resource)
-        hourly_cost = breakdown.total / resource.hours
-        monthly_cost = breakdown.total
-        yearly_cost = monthly_cost * 12
-
-        pricing = PricingResponse(
-            provider=CLOUD_PROVIDER,
-            instance_type=resource.instance_type,
-            region=resource.region,
-            hourly_cost=round(hourly_cost, 4),
-            monthly_cost=round(monthly_cost, 2),
-            yearly_cost=round(yearly_cost, 2),
-            breakdown=breakdown
-        )
+        pricing = price_usage(resource)
         breakdown_list.append(pricing)
-        total_monthly += monthly_cost
+        total_monthly += pricing.breakdown.total
 
     total_cost = total_monthly * request.period_months
 
@@ -300,14 +301,19 @@ async def get_recommendations(request: OptimizationRequest):
 
 
 @app.get("/spot-prices", response_model=SpotPricesResponse)
-async def get_spot_prices():
+async def get_spot_prices(instance_type: Optional[str] = None, region: Optional[str] = None):
     instances = PROVIDER_DATA["instances"]
-    regions = PROVIDER_DATA["regions"]
+    regions = PROVIDER_DATA["regions"][:2]
+
+    if instance_type is not None:
+        instances = {instance_type: instances[instance_type]} if instance_type in instances else {}
+    if region is not None:
+        regions = [r for r in regions if r == region]
 
     prices = []
 
     for instance_name, instance_details in instances.items():
-        for region in regions[:2]:
+        for region in regions:
             zones = [f"{region}a", f"{region}b", f"{region}c"]
 
             for zone in zones[:2]:
@@ -32,6 +32,15 @@ class PricingResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class BatchPricingRequest(BaseModel):
+    requests: List[ResourceUsage] = Field(..., min_length=1, max_length=100)
+
+
+class BatchPricingResponse(BaseModel):
+    provider: str
+    results: List[PricingResponse]
+
+
 class EstimateRequest(BaseModel):
     resources: List[ResourceUsage] = Field(..., min_length=1)
     period_months: int = Field(default=1, gt=0, le=36)
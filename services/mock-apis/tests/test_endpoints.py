@@ -141,6 +141,34 @@ class TestPricingEndpoint:
         assert data["yearly_cost"] >= 0
 
 
+class TestBatchPricingEndpoint:
+
+    def test_batch_pricing_returns_result_per_request(self):
+        payload = {
+            "requests": [
+                {"instance_type": "t3.micro", "cpu_cores": 2, "memory_gb": 1},
+                {"instance_type": "t3.small", "cpu_cores": 2, "memory_gb": 2}
+            ]
+        }
+        response = client.post("/pricing/batch", json=payload)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert len(data["results"]) == 2
+        assert [r["instance_type"] for r in data["results"]] == ["t3.micro", "t3.small"]
+
+    def test_batch_pricing_requires_requests(self):
+        response = client.post("/pricing/batch", json={"requests": []})
+        assert response.status_code == 422
+
+    def test_batch_pricing_with_invalid_instance(self):
+        payload = {
+            "requests": [{"instance_type": "invalid.type", "cpu_cores": 2, "memory_gb": 1}]
+        }
+        response = client.post("/pricing/batch", json=payload)
+        assert response.status_code == 404
+
+
 class TestEstimateEndpoint:
 
     def test_estimate_endpoint_returns_200(self):
@@ -338,3 +366,22 @@ class TestSpotPricesEndpoint:
 
             expected_spot = on_demand * (1 - discount / 100)
             assert abs(expected_spot - spot) < 0.01
+
+    def test_spot_prices_filter_by_instance_type(self):
+        response = client.get("/spot-prices", params={"instance_type": "t3.micro"})
+        data = response.json()
+
+        assert len(data["prices"]) > 0
+        assert all(price["instance_type"] == "t3.micro" for price in data["prices"])
+
+    def test_spot_prices_filter_by_region(self):
+        response = client.get("/spot-prices", params={"region": "us-east-1"})
+        data = response.json()
+
+        assert len(data["prices"]) > 0
+        assert all(price["region"] == "us-east-1" for price in data["prices"])
+
+    def test_spot_prices_unknown_instance_type_is_empty(self):
+        response = client.get("/spot-prices", params={"instance_type": "invalid.type"})
+        assert response.status_code == 200
+        assert response.json()["prices"] == []
@@ -4,17 +4,40 @@ from kubernetes import client
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from handlers.workload_reader import get_workload
+
 logger = logging.getLogger(__name__)
 
+OPTIMIZATION_TYPES = {
+    'ALL': (
+        'right_size_cpu',
+        'right_size_memory',
+        'reduce_replicas',
+        'spot_instances',
+        'scheduled_scaling'
+    ),
+    'CPU': ('right_size_cpu',),
+    'MEMORY': ('right_size_memory',),
+    'REPLICAS': ('reduce_replicas', 'increase_replicas'),
+    'SPOT_INSTANCES': ('spot_instances',),
+    'SCHEDULED_SCALING': ('scheduled_scaling',),
+}
+DEFAULT_OPTIMIZATION_TYPES = ('right_size_cpu', 'right_size_memory')
+
 
 class OptimizationHandler:
 
-    def __init__(self, api_client, optimizer_api_url: str):
+    def __init__(
+        self,
+        api_client,
+        optimizer_api_url: str,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_client = api_client
         self.optimizer_api_url = optimizer_api_url
         self.apps_v1 = client.AppsV1Api(api_client)
         self.core_v1 = client.CoreV1Api(api_client)
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.http_client = http_client or httpx.AsyncClient(timeout=30.0)
 
     async def analyze_workload(
         self,
@@ -25,7 +48,7 @@ class OptimizationHandler:
         min_confidence: float = 0.7
     ) -> Optional[Dict[str, Any]]:
         try:
-            workload = await self._get_workload(workload_name, workload_kind, namespace)
+            workload = await get_workload(self.apps_v1, workload_kind, workload_name, namespace)
             if not workload:
                 logger.warning(f"Workload {workload_kind}/{workload_name} not found in {namespace}")
                 return None
@@ -76,7 +99,7 @@ class OptimizationHandler:
         dry_run: bool = False
     ) -> bool:
         try:
-            workload = await self._get_workload(workload_name, workload_kind, namespace)
+            workload = await get_workload(self.apps_v1, workload_kind, workload_name, namespace)
             if not workload:
                 logger.error(f"Workload {workload_kind}/{workload_name} not found")
                 return False
@@ -235,28 +258,6 @@ class OptimizationHandler:
             logger.error(f"Error updating statefulset: {str(e)}", exc_info=True)
             return False
 
-    async def _get_workload(
-        self,
-        name: str,
-        kind: str,
-        namespace: str
-    ) -> Optional[Any]:
-        try:
-            if kind == 'Deployment':
-                return self.apps_v1.read_namespaced_deployment(name, namespace)
-            elif kind == 'StatefulSet':
-                return self.apps_v1.read_namespaced_stateful_set(name, namespace)
-            elif kind == 'DaemonSet':
-                return self.apps_v1.read_namespaced_daemon_set(name, namespace)
-            else:
-                logger.warning(f"Unsupported workload kind: {kind}")
-                return None
-        except client.exceptions.ApiException as e:
-            if e.status == 404:
-                logger.warning(f"Workload {kind}/{name} not found in namespace {namespace}")
-                return None
-            raise
-
     async def _get_workload_id(self, name: str, namespace: str) -> Optional[str]:
         try:
             url = f"{self.optimizer_api_url}/workloads"
@@ -280,23 +281,4 @@ class OptimizationHandler:
             return f"mock-{namespace}-{name}"
 
     def _get_optimization_types(self, optimization_type: str) -> list:
-        if optimization_type == 'ALL':
-            return [
-                'right_size_cpu',
-                'right_size_memory',
-                'reduce_replicas',
-                'spot_instances',
-                'scheduled_scaling'
-            ]
-        elif optimization_type == 'CPU':
-            return ['right_size_cpu']
-        elif optimization_type == 'MEMORY':
-            return ['right_size_memory']
-        elif optimization_type == 'REPLICAS':
-            return ['reduce_replicas', 'increase_replicas']
-        elif optimization_type == 'SPOT_INSTANCES':
-            return ['spot_instances']
-        elif optimization_type == 'SCHEDULED_SCALING':
-            return ['scheduled_scaling']
-        else:
-            return ['right_size_cpu', 'right_size_memory']
+        return list(OPTIMIZATION_TYPES.get(optimization_type, DEFAULT_OPTIMIZATION_TYPES))
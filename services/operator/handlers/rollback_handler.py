@@ -6,6 +6,8 @@ from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 import os
 
+from handlers.workload_reader import get_workload
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,20 +94,23 @@ class RollbackHandler:
             logger.info(f"Found original state: {original_state}")
 
             if workload_kind == 'Deployment':
-                success = await self._rollback_deployment(namespace, workload_name, original_state)
+                patched = await self._rollback_deployment(namespace, workload_name, original_state)
             elif workload_kind == 'StatefulSet':
-                success = await self._rollback_statefulset(namespace, workload_name, original_state)
+                patched = await self._rollback_statefulset(namespace, workload_name, original_state)
             else:
                 logger.error(f"Unsupported workload kind for rollback: {workload_kind}")
                 return False
 
-            if success:
+            if patched is not None:
                 logger.info(f"Successfully rolled back {workload_kind}/{workload_name}")
-                await self.validate_rollback(workload_name, workload_kind, namespace, original_state)
+                await self.validate_rollback(
+                    workload_name, workload_kind, namespace, original_state,
+                    current_workload=patched
+                )
             else:
                 logger.error(f"Failed to rollback {workload_kind}/{workload_name}")
 
-            return success
+            return patched is not None
 
         except Exception as e:
             logger.error(f"Error executing rollback: {str(e)}", exc_info=True)
@@ -116,10 +121,13 @@ class RollbackHandler:
         workload_name: str,
         workload_kind: str,
         namespace: str,
-        original_state: Dict[str, Any]
+        original_state: Dict[str, Any],
+        current_workload: Optional[Any] = None
     ) -> bool:
         try:
-            workload = await self._get_workload(workload_name, workload_kind, namespace)
+            workload = current_workload
+            if workload is None:
+                workload = await get_workload(self.apps_v1, workload_kind, workload_name, namespace)
             if not workload:
                 logger.error(f"Workload {workload_kind}/{workload_name} not found after rollback")
                 return False
@@ -158,7 +166,7 @@ class RollbackHandler:
         namespace: str,
         name: str,
         original_state: Dict[str, Any]
-    ) -> bool:
+    ) -> Optional[Any]:
         try:
             deployment = self.apps_v1.read_namespaced_deployment(name, namespace)
 
@@ -193,25 +201,25 @@ class RollbackHandler:
             deployment.metadata.annotations['optimization.k8s.io/rolled-back-at'] = datetime.utcnow().isoformat()
             deployment.metadata.annotations['optimization.k8s.io/rolled-back-by'] = 'cost-optimizer-operator'
 
-            self.apps_v1.patch_namespaced_deployment(
+            patched = self.apps_v1.patch_namespaced_deployment(
                 name=name,
                 namespace=namespace,
                 body=deployment
             )
 
             logger.info(f"Rolled back deployment {namespace}/{name}")
-            return True
+            return patched
 
         except Exception as e:
             logger.error(f"Error rolling back deployment: {str(e)}", exc_info=True)
-            return False
+            return None
 
     async def _rollback_statefulset(
         self,
         namespace: str,
         name: str,
         original_state: Dict[str, Any]
-    ) -> bool:
+    ) -> Optional[Any]:
         try:
             statefulset = self.apps_v1.read_namespaced_stateful_set(name, namespace)
 
@@ -246,18 +254,18 @@ class RollbackHandler:
             statefulset.metadata.annotations['optimization.k8s.io/rolled-back-at'] = datetime.utcnow().isoformat()
             statefulset.metadata.annotations['optimization.k8s.io/rolled-back-by'] = 'cost-optimizer-operator'
 
-            self.apps_v1.patch_namespaced_stateful_set(
+            patched = self.apps_v1.patch_namespaced_stateful_set(
                 name=name,
                 namespace=namespace,
                 body=statefulset
             )
 
             logger.info(f"Rolled back statefulset {namespace}/{name}")
-            return True
+            return patched
 
         except Exception as e:
             logger.error(f"Error rolling back statefulset: {str(e)}", exc_info=True)
-            return False
+            return None
 
     async def _get_original_state(
         self,
@@ -345,24 +353,3 @@ class RollbackHandler:
                 resources['memory_limit'] = container.resources.limits.get('memory', '0')
 
         return resources
-
-    async def _get_workload(
-        self,
-        name: str,
-        kind: str,
-        namespace: str
-    ) -> Optional[Any]:
-        try:
-            if kind == 'Deployment':
-                return self.apps_v1.read_namespaced_deployment(name, namespace)
-            elif kind == 'StatefulSet':
-                return self.apps_v1.read_namespaced_stateful_set(name, namespace)
-            elif kind == 'DaemonSet':
-                return self.apps_v1.read_namespaced_daemon_set(name, namespace)
-            else:
-                logger.warning(f"Unsupported workload kind: {kind}")
-                return None
-        except client.exceptions.ApiException as e:
-            if e.status == 404:
-                return None
-            raise
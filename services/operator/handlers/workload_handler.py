@@ -4,17 +4,24 @@ from kubernetes import client
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
+from handlers.workload_reader import get_workload
+
 logger = logging.getLogger(__name__)
 
 
 class WorkloadHandler:
 
-    def __init__(self, api_client, optimizer_api_url: str):
+    def __init__(
+        self,
+        api_client,
+        optimizer_api_url: str,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_client = api_client
         self.optimizer_api_url = optimizer_api_url
         self.apps_v1 = client.AppsV1Api(api_client)
         self.core_v1 = client.CoreV1Api(api_client)
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.http_client = http_client or httpx.AsyncClient(timeout=30.0)
 
     async def watch_deployments(self, namespace: str = None) -> List[Dict[str, Any]]:
         try:
@@ -87,7 +94,7 @@ class WorkloadHandler:
         max_change_percent: int = 50
     ) -> tuple[bool, str]:
         try:
-            workload = await self._get_workload(workload_name, workload_kind, namespace)
+            workload = await get_workload(self.apps_v1, workload_kind, workload_name, namespace)
             if not workload:
                 return False, f"Workload {workload_kind}/{workload_name} not found"
 
@@ -187,27 +194,6 @@ class WorkloadHandler:
         containers = workload.spec.template.spec.containers
         return self._get_current_resources_from_spec(containers)
 
-    async def _get_workload(
-        self,
-        name: str,
-        kind: str,
-        namespace: str
-    ) -> Optional[Any]:
-        try:
-            if kind == 'Deployment':
-                return self.apps_v1.read_namespaced_deployment(name, namespace)
-            elif kind == 'StatefulSet':
-                return self.apps_v1.read_namespaced_stateful_set(name, namespace)
-            elif kind == 'DaemonSet':
-                return self.apps_v1.read_namespaced_daemon_set(name, namespace)
-            else:
-                logger.warning(f"Unsupported workload kind: {kind}")
-                return None
-        except client.exceptions.ApiException as e:
-            if e.status == 404:
-                return None
-            raise
-
     async def _check_pod_disruption_budget(
         self,
         namespace: str,
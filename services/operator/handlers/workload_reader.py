@@ -0,0 +1,32 @@
+import logging
+from kubernetes import client
+from typing import Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+_READERS = {
+    'Deployment': lambda apps_v1, namespace, name: apps_v1.read_namespaced_deployment(name, namespace),
+    'StatefulSet': lambda apps_v1, namespace, name: apps_v1.read_namespaced_stateful_set(name, namespace),
+    'DaemonSet': lambda apps_v1, namespace, name: apps_v1.read_namespaced_daemon_set(name, namespace),
+}
+
+
+async def get_workload(
+    apps_v1: client.AppsV1Api,
+    kind: str,
+    name: str,
+    namespace: str
+) -> Optional[Any]:
+    reader = _READERS.get(kind)
+    if reader is None:
+        logger.warning(f"Unsupported workload kind: {kind}")
+        return None
+
+    try:
+        return reader(apps_v1, namespace, name)
+    except client.exceptions.ApiException as e:
+        if e.status == 404:
+            logger.warning(f"Workload {kind}/{name} not found in namespace {namespace}")
+            return None
+        raise
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 
+import asyncio
+import httpx
 import kopf
 import kubernetes
 import logging
 import os
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from prometheus_client import Counter, Gauge, Histogram, start_http_server
-from typing import Optional, Dict, Any
+from collections import defaultdict
+from typing import Optional, Dict, Any, Tuple
 
 from handlers.optimization_handler import OptimizationHandler
 from handlers.workload_handler import WorkloadHandler
@@ -20,6 +24,14 @@ logger = logging.getLogger(__name__)
 
 OPTIMIZER_API_URL = os.getenv("OPTIMIZER_API_URL", "http://optimizer-api:8000")
 PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", "8080"))
+RECOMMENDATION_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", "600"))
+KOPF_MAX_WORKERS = int(os.getenv("KOPF_MAX_WORKERS", str((os.cpu_count() or 1) * 4)))
+KOPF_WORKER_LIMIT = int(os.getenv("KOPF_WORKER_LIMIT", "50"))
+KOPF_IDLE_TIMEOUT = float(os.getenv("KOPF_IDLE_TIMEOUT", "2.0"))
+KOPF_BATCH_WINDOW = float(os.getenv("KOPF_BATCH_WINDOW", "0.1"))
+EVENT_DEDUP_WINDOW = float(os.getenv("EVENT_DEDUP_WINDOW", "60"))
+
+RISK_LEVELS = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'CRITICAL': 4}
 
 optimizations_created = Counter(
     'costopt_optimizations_created_total',
@@ -39,9 +51,10 @@ rollbacks_executed = Counter(
     'costopt_rollbacks_total',
     'Total number of rollbacks executed'
 )
-total_savings = Gauge(
-    'costopt_total_monthly_savings_usd',
-    'Total monthly cost savings in USD'
+monthly_savings = Gauge(
+    'costopt_monthly_savings_usd',
+    'Monthly cost savings in USD by CostOptimization',
+    ['namespace', 'name']
 )
 optimization_duration = Histogram(
     'costopt_optimization_duration_seconds',
@@ -49,32 +62,155 @@ optimization_duration = Histogram(
     buckets=[1, 5, 10, 30, 60, 120, 300]
 )
 
+applied_by_type = {
+    t: optimizations_applied.labels(optimization_type=t)
+    for t in ('CPU', 'MEMORY', 'REPLICAS', 'ALL', 'SPOT_INSTANCES', 'SCHEDULED_SCALING')
+}
+failed_by_reason = {
+    r: optimizations_failed.labels(reason=r)
+    for r in ('creation_error', 'application_failed', 'periodic_check_error')
+}
+
+http_client: Optional[httpx.AsyncClient] = None
 optimization_handler: Optional[OptimizationHandler] = None
 workload_handler: Optional[WorkloadHandler] = None
 rollback_handler: Optional[RollbackHandler] = None
 
+optimization_targets: Dict[Tuple[str, str], str] = {}
+TARGET_NAMESPACES: set = set()
+
+
+def _track_target(namespace: str, name: str, spec) -> None:
+    target = spec.get('targetWorkload', {})
+    optimization_targets[(namespace, name)] = target.get('namespace', namespace)
+    TARGET_NAMESPACES.clear()
+    TARGET_NAMESPACES.update(optimization_targets.values())
+
+
+def _untrack_target(namespace: str, name: str) -> None:
+    optimization_targets.pop((namespace, name), None)
+    TARGET_NAMESPACES.clear()
+    TARGET_NAMESPACES.update(optimization_targets.values())
+
+
+posted_events: Dict[Tuple[str, str, str], float] = {}
+
+
+def _post_event(body, reason: str, message: str) -> None:
+    metadata = body.get('metadata', {})
+    key = (metadata.get('namespace'), metadata.get('name'), reason)
+    now = time.monotonic()
+
+    last_posted = posted_events.get(key)
+    if last_posted is not None and now - last_posted < EVENT_DEDUP_WINDOW:
+        return
+
+    for k in [k for k, t in posted_events.items() if now - t >= EVENT_DEDUP_WINDOW]:
+        del posted_events[k]
+
+    posted_events[key] = now
+    kopf.info(body, reason=reason, message=message)
+
+
+recommendation_cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+recommendation_locks: Dict[Tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+# callers holding or queued on each lock; a lock is dropped once nobody needs it
+recommendation_lock_users: Dict[Tuple, int] = defaultdict(int)
+
+
+async def _cached_analysis(
+    workload_name: str,
+    workload_kind: str,
+    namespace: str,
+    optimization_type: str,
+    min_confidence: float
+) -> Optional[Dict[str, Any]]:
+    key = (workload_kind, namespace, workload_name, optimization_type, min_confidence)
+    loop = asyncio.get_running_loop()
+
+    entry = recommendation_cache.get(key)
+    if entry and loop.time() - entry[0] < RECOMMENDATION_CACHE_TTL:
+        return entry[1]
+
+    recommendation_lock_users[key] += 1
+    try:
+        async with recommendation_locks[key]:
+            entry = recommendation_cache.get(key)
+            if entry and loop.time() - entry[0] < RECOMMENDATION_CACHE_TTL:
+                return entry[1]
+
+            with optimization_duration.time():
+                recommendation = await optimization_handler.analyze_workload(
+                    workload_name=workload_name,
+                    workload_kind=workload_kind,
+                    namespace=namespace,
+                    optimization_type=optimization_type,
+                    min_confidence=min_confidence
+                )
+
+            if not recommendation:
+                return recommendation
+
+            now = loop.time()
+            expired = [
+                k for k, (cached_at, _) in recommendation_cache.items()
+                if k != key and now - cached_at > 2 * RECOMMENDATION_CACHE_TTL
+            ]
+            for k in expired:
+                del recommendation_cache[k]
+
+            recommendation_cache[key] = (now, recommendation)
+            return recommendation
+    finally:
+        recommendation_lock_users[key] -= 1
+        if not recommendation_lock_users[key]:
+            del recommendation_lock_users[key]
+            recommendation_locks.pop(key, None)
+
+
+# recommendations computed from the pre-apply resources must not be applied again
+def _invalidate_analysis(workload_kind: str, namespace: str, workload_name: str) -> None:
+    workload = (workload_kind, namespace, workload_name)
+    for k in [k for k in recommendation_cache if k[:3] == workload]:
+        del recommendation_cache[k]
+
 
 @kopf.on.startup()
 async def configure(settings: kopf.OperatorSettings, **_):
     settings.posting.level = logging.INFO
     settings.watching.connect_timeout = 1 * 60
     settings.watching.server_timeout = 10 * 60
+    settings.execution.max_workers = KOPF_MAX_WORKERS
+    settings.batching.worker_limit = KOPF_WORKER_LIMIT
+    settings.batching.idle_timeout = KOPF_IDLE_TIMEOUT
+    settings.batching.batch_window = KOPF_BATCH_WINDOW
 
     start_http_server(PROMETHEUS_PORT)
     logger.info(f"Prometheus metrics server started on port {PROMETHEUS_PORT}")
 
-    global optimization_handler, workload_handler, rollback_handler
+    global http_client, optimization_handler, workload_handler, rollback_handler
 
     kubernetes.config.load_incluster_config()
     api_client = kubernetes.client.ApiClient()
 
+    http_client = httpx.AsyncClient(
+        timeout=30.0,
+        limits=httpx.Limits(
+            max_connections=64,
+            max_keepalive_connections=64,
+            keepalive_expiry=60.0
+        )
+    )
+
     optimization_handler = OptimizationHandler(
         api_client=api_client,
-        optimizer_api_url=OPTIMIZER_API_URL
+        optimizer_api_url=OPTIMIZER_API_URL,
+        http_client=http_client
     )
     workload_handler = WorkloadHandler(
         api_client=api_client,
-        optimizer_api_url=OPTIMIZER_API_URL
+        optimizer_api_url=OPTIMIZER_API_URL,
+        http_client=http_client
     )
     rollback_handler = RollbackHandler(api_client=api_client)
 
@@ -82,10 +218,18 @@ async def configure(settings: kopf.OperatorSettings, **_):
     logger.info(f"Optimizer API URL: {OPTIMIZER_API_URL}")
 
 
+@kopf.on.cleanup()
+async def close_http_client(**_):
+    if http_client is not None:
+        await http_client.aclose()
+
+
 @kopf.on.create('optimization.k8s.io', 'v1', 'costoptimizations')
 async def create_optimization(spec, name, namespace, status, **kwargs):
-    logger.info(f"CostOptimization created: {namespace}/{name}")
+    logger.info("CostOptimization created: %s/%s", namespace, name)
+    now_iso = datetime.now(timezone.utc).isoformat(timespec='seconds')
     optimizations_created.inc()
+    _track_target(namespace, name, spec)
 
     try:
         target = spec.get('targetWorkload', {})
@@ -97,11 +241,11 @@ async def create_optimization(spec, name, namespace, status, **kwargs):
         auto_apply = spec.get('autoApply', False)
 
         logger.info(
-            f"Processing optimization for {workload_kind}/{workload_name} "
-            f"in namespace {workload_namespace}"
+            "Processing optimization for %s/%s in namespace %s",
+            workload_kind, workload_name, workload_namespace
         )
 
-        kopf.info(
+        _post_event(
             kwargs['body'],
             reason='OptimizationCreated',
             message=f'Started analyzing {workload_kind}/{workload_name}'
@@ -110,42 +254,52 @@ async def create_optimization(spec, name, namespace, status, **kwargs):
         return {
             'phase': 'Analyzing',
             'message': f'Analyzing {workload_kind}/{workload_name} for {optimization_type} optimization',
-            'lastAnalysis': datetime.utcnow().isoformat()
+            'lastAnalysis': now_iso
         }
 
     except Exception as e:
-        logger.error(f"Error creating optimization: {str(e)}", exc_info=True)
-        optimizations_failed.labels(reason='creation_error').inc()
+        logger.error("Error creating optimization: %s", e, exc_info=True)
+        failed_by_reason['creation_error'].inc()
         raise kopf.PermanentError(f"Failed to create optimization: {str(e)}")
 
 
-@kopf.on.update('optimization.k8s.io', 'v1', 'costoptimizations')
-async def update_optimization(spec, name, namespace, old, new, **kwargs):
-    logger.info(f"CostOptimization updated: {namespace}/{name}")
+@kopf.on.update('optimization.k8s.io', 'v1', 'costoptimizations', field='spec.autoApply')
+async def update_optimization(old, new, name, namespace, **kwargs):
+    logger.info("AutoApply changed for %s/%s: %s", namespace, name, new)
+    _post_event(
+        kwargs['body'],
+        reason='ConfigurationChanged',
+        message=f'AutoApply setting changed to {new}'
+    )
 
-    old_spec = old.get('spec', {})
-    new_spec = new.get('spec', {})
+    return {'phase': 'Ready', 'message': 'Configuration updated'}
 
-    if old_spec.get('autoApply') != new_spec.get('autoApply'):
-        logger.info(f"AutoApply changed for {namespace}/{name}: {new_spec.get('autoApply')}")
-        kopf.info(
-            kwargs['body'],
-            reason='ConfigurationChanged',
-            message=f'AutoApply setting changed to {new_spec.get("autoApply")}'
-        )
 
-    return {'phase': 'Ready', 'message': 'Configuration updated'}
+@kopf.on.field('optimization.k8s.io', 'v1', 'costoptimizations', field='spec.targetWorkload')
+async def update_target(spec, name, namespace, **kwargs):
+    _track_target(namespace, name, spec)
+
+
+@kopf.on.resume('optimization.k8s.io', 'v1', 'costoptimizations')
+async def resume_optimization(spec, name, namespace, **kwargs):
+    _track_target(namespace, name, spec)
 
 
 @kopf.on.delete('optimization.k8s.io', 'v1', 'costoptimizations')
 async def delete_optimization(spec, name, namespace, status, **kwargs):
-    logger.info(f"CostOptimization deleted: {namespace}/{name}")
+    logger.info("CostOptimization deleted: %s/%s", namespace, name)
+    _untrack_target(namespace, name)
+
+    try:
+        monthly_savings.remove(namespace, name)
+    except KeyError:
+        pass
 
     try:
         phase = status.get('phase')
 
         if phase == 'Applied':
-            logger.info(f"Executing rollback for {namespace}/{name}")
+            logger.info("Executing rollback for %s/%s", namespace, name)
 
             target = spec.get('targetWorkload', {})
             workload_name = target.get('name')
@@ -159,23 +313,25 @@ async def delete_optimization(spec, name, namespace, status, **kwargs):
                     namespace=workload_namespace
                 )
                 rollbacks_executed.inc()
-                logger.info(f"Rollback completed for {namespace}/{name}")
+                logger.info("Rollback completed for %s/%s", namespace, name)
             else:
-                logger.info(f"Rollback disabled for {namespace}/{name}")
+                logger.info("Rollback disabled for %s/%s", namespace, name)
 
-        kopf.info(
+        _post_event(
             kwargs['body'],
             reason='OptimizationDeleted',
             message=f'CostOptimization {name} deleted'
         )
 
     except Exception as e:
-        logger.error(f"Error during deletion: {str(e)}", exc_info=True)
+        logger.error("Error during deletion: %s", e, exc_info=True)
 
 
 @kopf.timer('optimization.k8s.io', 'v1', 'costoptimizations', interval=1800.0)
 async def periodic_optimization_check(spec, name, namespace, status, patch, **kwargs):
-    logger.info(f"Periodic check for {namespace}/{name}")
+    logger.info("Periodic check for %s/%s", namespace, name)
+    now_iso = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    status_update: Dict[str, Any] = {}
 
     try:
         target = spec.get('targetWorkload', {})
@@ -188,48 +344,51 @@ async def periodic_optimization_check(spec, name, namespace, status, patch, **kw
         min_confidence = spec.get('minConfidence', 0.7)
         max_risk_level = spec.get('maxRiskLevel', 'MEDIUM')
 
-        with optimization_duration.time():
-            recommendation = await optimization_handler.analyze_workload(
-                workload_name=workload_name,
-                workload_kind=workload_kind,
-                namespace=workload_namespace,
-                optimization_type=optimization_type,
-                min_confidence=min_confidence
-            )
+        recommendation = await _cached_analysis(
+            workload_name=workload_name,
+            workload_kind=workload_kind,
+            namespace=workload_namespace,
+            optimization_type=optimization_type,
+            min_confidence=min_confidence
+        )
 
         if not recommendation:
-            logger.info(f"No optimization found for {workload_kind}/{workload_name}")
-            patch.status['phase'] = 'Ready'
-            patch.status['message'] = 'No optimization opportunities found'
-            patch.status['lastAnalysis'] = datetime.utcnow().isoformat()
+            logger.info("No optimization found for %s/%s", workload_kind, workload_name)
+            status_update.update(
+                phase='Ready',
+                message='No optimization opportunities found',
+                lastAnalysis=now_iso
+            )
             return
 
-        logger.info(
-            f"Found optimization for {workload_kind}/{workload_name}: "
-            f"${recommendation.get('monthly_savings', 0):.2f}/month savings"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Found optimization for %s/%s: $%.2f/month savings",
+                workload_kind, workload_name, recommendation.get('monthly_savings', 0)
+            )
+
+        risk_info = recommendation.get('risk_assessment') or {}
 
-        patch.status['currentRecommendation'] = {
+        status_update['currentRecommendation'] = {
             'optimizationType': recommendation.get('optimization_type'),
             'currentCost': recommendation.get('current_cost', {}).get('monthly', 0),
             'optimizedCost': recommendation.get('optimized_cost', {}).get('monthly', 0),
             'monthlySavings': recommendation.get('monthly_savings', 0),
             'confidenceScore': recommendation.get('confidence_score', 0),
-            'riskLevel': recommendation.get('risk_assessment', {}).get('level', 'UNKNOWN'),
+            'riskLevel': risk_info.get('level', 'UNKNOWN'),
             'changes': recommendation.get('recommended_config', {})
         }
-        patch.status['lastAnalysis'] = datetime.utcnow().isoformat()
+        status_update['lastAnalysis'] = now_iso
 
-        risk_level = recommendation.get('risk_assessment', {}).get('level', 'HIGH')
+        risk_level = risk_info.get('level', 'HIGH')
         confidence = recommendation.get('confidence_score', 0)
 
-        risk_levels = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'CRITICAL': 4}
-        max_risk = risk_levels.get(max_risk_level, 2)
-        current_risk = risk_levels.get(risk_level, 4)
+        max_risk = RISK_LEVELS.get(max_risk_level, 2)
+        current_risk = RISK_LEVELS.get(risk_level, 4)
 
         if auto_apply and not dry_run:
             if confidence >= min_confidence and current_risk <= max_risk:
-                logger.info(f"Auto-applying optimization for {workload_kind}/{workload_name}")
+                logger.info("Auto-applying optimization for %s/%s", workload_kind, workload_name)
 
                 success = await optimization_handler.apply_optimization(
                     workload_name=workload_name,
@@ -240,19 +399,24 @@ async def periodic_optimization_check(spec, name, namespace, status, patch, **kw
                 )
 
                 if success:
-                    optimizations_applied.labels(
-                        optimization_type=optimization_type
-                    ).inc()
+                    _invalidate_analysis(workload_kind, workload_namespace, workload_name)
+
+                    applied = applied_by_type.get(optimization_type)
+                    if applied is None:
+                        applied = optimizations_applied.labels(optimization_type=optimization_type)
+                    applied.inc()
 
                     current_savings = status.get('totalSavings', 0)
                     new_savings = current_savings + recommendation.get('monthly_savings', 0)
-                    total_savings.set(new_savings)
-
-                    patch.status['phase'] = 'Applied'
-                    patch.status['message'] = 'Optimization applied successfully'
-                    patch.status['lastApplied'] = datetime.utcnow().isoformat()
-                    patch.status['appliedOptimizations'] = status.get('appliedOptimizations', 0) + 1
-                    patch.status['totalSavings'] = new_savings
+                    monthly_savings.labels(namespace=namespace, name=name).set(new_savings)
+
+                    status_update.update(
+                        phase='Applied',
+                        message='Optimization applied successfully',
+                        lastApplied=now_iso,
+                        appliedOptimizations=status.get('appliedOptimizations', 0) + 1,
+                        totalSavings=new_savings
+                    )
 
                     kopf.info(
                         kwargs['body'],
@@ -260,9 +424,9 @@ async def periodic_optimization_check(spec, name, namespace, status, patch, **kw
                         message=f'Applied optimization: ${recommendation.get("monthly_savings", 0):.2f}/month savings'
                     )
                 else:
-                    optimizations_failed.labels(reason='application_failed').inc()
-                    patch.status['phase'] = 'Failed'
-                    patch.status['message'] = 'Failed to apply optimization'
+                    failed_by_reason['application_failed'].inc()
+                    status_update['phase'] = 'Failed'
+                    status_update['message'] = 'Failed to apply optimization'
 
                     kopf.warn(
                         kwargs['body'],
@@ -271,43 +435,43 @@ async def periodic_optimization_check(spec, name, namespace, status, patch, **kw
                     )
             else:
                 logger.info(
-                    f"Skipping auto-apply: confidence={confidence:.2f}, "
-                    f"risk={risk_level}, max_risk={max_risk_level}"
+                    "Skipping auto-apply: confidence=%.2f, risk=%s, max_risk=%s",
+                    confidence, risk_level, max_risk_level
                 )
-                patch.status['phase'] = 'Ready'
-                patch.status['message'] = (
+                status_update['phase'] = 'Ready'
+                status_update['message'] = (
                     f'Optimization found but not applied: '
                     f'confidence={confidence:.2f}, risk={risk_level}'
                 )
         else:
-            patch.status['phase'] = 'Ready'
+            status_update['phase'] = 'Ready'
             if dry_run:
-                patch.status['message'] = f'Dry-run mode: Would save ${recommendation.get("monthly_savings", 0):.2f}/month'
+                status_update['message'] = f'Dry-run mode: Would save ${recommendation.get("monthly_savings", 0):.2f}/month'
             else:
-                patch.status['message'] = 'Auto-apply disabled'
+                status_update['message'] = 'Auto-apply disabled'
 
     except Exception as e:
-        logger.error(f"Error in periodic check: {str(e)}", exc_info=True)
-        optimizations_failed.labels(reason='periodic_check_error').inc()
-        patch.status['phase'] = 'Failed'
-        patch.status['message'] = f'Error: {str(e)}'
-
-
-@kopf.daemon('optimization.k8s.io', 'v1', 'costoptimizations')
-async def watch_optimization_status(spec, name, namespace, stopped, **kwargs):
-    logger.info(f"Starting status watcher for {namespace}/{name}")
+        logger.error("Error in periodic check: %s", e, exc_info=True)
+        failed_by_reason['periodic_check_error'].inc()
+        status_update['phase'] = 'Failed'
+        status_update['message'] = f'Error: {str(e)}'
+    finally:
+        patch.status.update(status_update)
 
-    while not stopped:
-        await stopped.wait(60)
 
-
-@kopf.on.event('', 'v1', 'pods')
+@kopf.on.event('', 'v1', 'pods', when=lambda namespace, **_: namespace in TARGET_NAMESPACES)
 async def pod_event_handler(event, name, namespace, **kwargs):
     event_type = event.get('type')
 
-    if event_type in ['MODIFIED', 'DELETED']:
-        logger.debug(f"Pod event: {event_type} {namespace}/{name}")
+    if event_type in ('MODIFIED', 'DELETED') and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Pod event: %s %s/%s", event_type, namespace, name)
 
 
 if __name__ == '__main__':
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop")
+
     kopf.run()
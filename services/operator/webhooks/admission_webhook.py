@@ -1,42 +1,147 @@
 #!/usr/bin/env python3
 
+import base64
 import logging
-import json
-from flask import Flask, request, jsonify
+import os
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
 from typing import Dict, Any, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_TLS_CERT = os.getenv("WEBHOOK_TLS_CERT", "/etc/webhook/certs/tls.crt")
+WEBHOOK_TLS_KEY = os.getenv("WEBHOOK_TLS_KEY", "/etc/webhook/certs/tls.key")
+
+_KIND_ORDER = ['Deployment', 'StatefulSet', 'DaemonSet']
+_TYPE_ORDER = ['CPU', 'MEMORY', 'REPLICAS', 'ALL', 'SPOT_INSTANCES', 'SCHEDULED_SCALING']
+_RISK_ORDER = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+_ALLOWED_KINDS = frozenset(_KIND_ORDER)
+_ALLOWED_TYPES = frozenset(_TYPE_ORDER)
+_ALLOWED_RISK = frozenset(_RISK_ORDER)
+_HIGH_RISK = frozenset({'HIGH', 'CRITICAL'})
+_DAEMONSET_BLOCKED_TYPES = frozenset({'REPLICAS', 'ALL'})
+_PROTECTED = frozenset({
+    'kube-dns',
+    'coredns',
+    'kube-proxy',
+    'metrics-server',
+    'kubernetes-dashboard'
+})
+_PROTECTED_NS = frozenset({'kube-system', 'kube-public', 'kube-node-lease'})
+
+_KIND_ERROR = f"targetWorkload.kind must be one of {_KIND_ORDER}"
+_TYPE_ERROR = f"optimizationType must be one of {_TYPE_ORDER}"
+_RISK_ERROR = f"maxRiskLevel must be one of {_RISK_ORDER}"
+
+_STATUS_PATCH = {
+    'op': 'add',
+    'path': '/status',
+    'value': {
+        'phase': 'Pending',
+        'message': 'CostOptimization created',
+        'appliedOptimizations': 0,
+        'totalSavings': 0.0,
+        'conditions': []
+    }
+}
+_LABELS_PATCH = {
+    'op': 'add',
+    'path': '/metadata/labels',
+    'value': {}
+}
+_MANAGED_BY_PATCH = {
+    'op': 'add',
+    'path': '/metadata/labels/app.kubernetes.io~1managed-by',
+    'value': 'cost-optimizer-operator'
+}
+_DEFAULT_PATCHES = (_STATUS_PATCH, _LABELS_PATCH, _MANAGED_BY_PATCH)
+_DEFAULT_PATCH_BASE64 = base64.b64encode(orjson.dumps(_DEFAULT_PATCHES)).decode('ascii')
+
+_UID_PLACEHOLDER = b'"__uid__"'
+_ALLOWED_REVIEW = orjson.dumps({
+    'apiVersion': 'admission.k8s.io/v1',
+    'kind': 'AdmissionReview',
+    'response': {
+        'uid': '__uid__',
+        'allowed': True
+    }
+})
+_DEFAULT_MUTATION_REVIEW = orjson.dumps({
+    'apiVersion': 'admission.k8s.io/v1',
+    'kind': 'AdmissionReview',
+    'response': {
+        'uid': '__uid__',
+        'allowed': True,
+        'patchType': 'JSONPatch',
+        'patch': _DEFAULT_PATCH_BASE64
+    }
+})
+
+
+def _render_review(template: bytes, uid: Any) -> Response:
+    return Response(
+        content=template.replace(_UID_PLACEHOLDER, orjson.dumps(uid), 1),
+        media_type='application/json'
+    )
+
+
+app = FastAPI(
+    title="CostOptimization Admission Webhook",
+    default_response_class=ORJSONResponse
+)
 
 
 class AdmissionWebhook:
 
     @staticmethod
-    def validate_cost_optimization(obj: Dict[str, Any]) -> Tuple[bool, str]:
-        spec = obj.get('spec', {})
+    def check(obj: Dict[str, Any]) -> Tuple[bool, int, str]:
+        spec = obj.get('spec') or {}
+        metadata = obj.get('metadata') or {}
+        target_workload = spec.get('targetWorkload') or {}
+        auto_apply = spec.get('autoApply', False)
+        max_change_percent = spec.get('maxChangePercent', 50)
 
-        target_workload = spec.get('targetWorkload', {})
-        if not target_workload.get('name'):
-            return False, "targetWorkload.name is required"
+        valid, message = AdmissionWebhook._validate_spec(spec, target_workload, auto_apply, max_change_percent)
+        if not valid:
+            return False, 400, message
 
-        if not target_workload.get('kind'):
-            return False, "targetWorkload.kind is required"
+        safe, message = AdmissionWebhook._check_safety(metadata, target_workload, auto_apply, max_change_percent)
+        if not safe:
+            return False, 403, message
 
-        allowed_kinds = ['Deployment', 'StatefulSet', 'DaemonSet']
-        if target_workload.get('kind') not in allowed_kinds:
-            return False, f"targetWorkload.kind must be one of {allowed_kinds}"
+        return True, 200, message
 
+    @staticmethod
+    def _validate_spec(
+        spec: Dict[str, Any],
+        target_workload: Dict[str, Any],
+        auto_apply: bool,
+        max_change_percent: float
+    ) -> Tuple[bool, str]:
+        name = target_workload.get('name')
+        kind = target_workload.get('kind')
         optimization_type = spec.get('optimizationType')
+
+        if not name:
+            return False, "targetWorkload.name is required"
+        if not kind:
+            return False, "targetWorkload.kind is required"
         if not optimization_type:
             return False, "optimizationType is required"
 
-        allowed_types = ['CPU', 'MEMORY', 'REPLICAS', 'ALL', 'SPOT_INSTANCES', 'SCHEDULED_SCALING']
-        if optimization_type not in allowed_types:
-            return False, f"optimizationType must be one of {allowed_types}"
+        max_risk_level = spec.get('maxRiskLevel', 'MEDIUM')
+
+        if kind not in _ALLOWED_KINDS:
+            return False, _KIND_ERROR
+        if optimization_type not in _ALLOWED_TYPES:
+            return False, _TYPE_ERROR
+        if max_risk_level not in _ALLOWED_RISK:
+            return False, _RISK_ERROR
 
-        max_change_percent = spec.get('maxChangePercent', 50)
         if max_change_percent < 1 or max_change_percent > 100:
             return False, "maxChangePercent must be between 1 and 100"
 
@@ -44,184 +149,126 @@ class AdmissionWebhook:
         if min_confidence < 0.0 or min_confidence > 1.0:
             return False, "minConfidence must be between 0.0 and 1.0"
 
-        dry_run = spec.get('dryRun', True)
-        auto_apply = spec.get('autoApply', False)
+        if kind == 'DaemonSet' and optimization_type in _DAEMONSET_BLOCKED_TYPES:
+            return False, "Cannot optimize replicas for DaemonSet"
 
-        if auto_apply and dry_run:
-            return False, "Cannot enable both autoApply and dryRun"
+        if not auto_apply:
+            return True, "Validation passed"
 
-        max_risk_level = spec.get('maxRiskLevel', 'MEDIUM')
-        allowed_risk_levels = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
-        if max_risk_level not in allowed_risk_levels:
-            return False, f"maxRiskLevel must be one of {allowed_risk_levels}"
+        if spec.get('dryRun', True):
+            return False, "Cannot enable both autoApply and dryRun"
 
-        if auto_apply and max_risk_level in ['HIGH', 'CRITICAL']:
+        if max_risk_level in _HIGH_RISK:
             return False, "Cannot enable autoApply with maxRiskLevel HIGH or CRITICAL"
 
-        if target_workload.get('kind') == 'StatefulSet' and optimization_type == 'REPLICAS':
-            if auto_apply:
-                return False, "Cannot auto-apply replica optimization to StatefulSet. Manual intervention required."
-
-        if target_workload.get('kind') == 'DaemonSet' and optimization_type in ['REPLICAS', 'ALL']:
-            return False, "Cannot optimize replicas for DaemonSet"
+        if kind == 'StatefulSet' and optimization_type == 'REPLICAS':
+            return False, "Cannot auto-apply replica optimization to StatefulSet. Manual intervention required."
 
-        if optimization_type == 'SPOT_INSTANCES':
-            if auto_apply and min_confidence < 0.8:
-                return False, "Spot instance optimization requires minConfidence >= 0.8 for auto-apply"
+        if optimization_type == 'SPOT_INSTANCES' and min_confidence < 0.8:
+            return False, "Spot instance optimization requires minConfidence >= 0.8 for auto-apply"
 
         return True, "Validation passed"
 
     @staticmethod
-    def prevent_dangerous_optimization(obj: Dict[str, Any]) -> Tuple[bool, str]:
-        spec = obj.get('spec', {})
-        metadata = obj.get('metadata', {})
-
+    def _check_safety(
+        metadata: Dict[str, Any],
+        target_workload: Dict[str, Any],
+        auto_apply: bool,
+        max_change_percent: float
+    ) -> Tuple[bool, str]:
         namespace = metadata.get('namespace', 'default')
-        if namespace in ['kube-system', 'kube-public', 'kube-node-lease']:
+        if namespace in _PROTECTED_NS:
             return False, f"Cannot optimize workloads in {namespace} namespace"
 
-        target_workload = spec.get('targetWorkload', {})
         workload_name = target_workload.get('name', '')
-
-        protected_workloads = [
-            'kube-dns',
-            'coredns',
-            'kube-proxy',
-            'metrics-server',
-            'kubernetes-dashboard'
-        ]
-
-        if workload_name in protected_workloads:
+        if workload_name in _PROTECTED:
             return False, f"Cannot optimize protected workload: {workload_name}"
 
-        labels = metadata.get('labels', {})
-        if labels.get('app.kubernetes.io/component') == 'controller':
+        if metadata.get('labels', {}).get('app.kubernetes.io/component') == 'controller':
             return False, "Cannot optimize Kubernetes controller components"
 
-        max_change_percent = spec.get('maxChangePercent', 50)
-        if max_change_percent > 80 and spec.get('autoApply', False):
+        if auto_apply and max_change_percent > 80:
             return False, "Cannot auto-apply optimizations with maxChangePercent > 80%"
 
         return True, "Safety checks passed"
 
 
-@app.route('/validate', methods=['POST'])
-def validate():
+@app.post('/validate')
+async def validate(request: Request):
+    admission_review = {}
     try:
-        admission_review = request.get_json()
+        admission_review = orjson.loads(await request.body())
 
         logger.info(f"Received validation request: {admission_review.get('request', {}).get('uid')}")
 
         req = admission_review.get('request', {})
         obj = req.get('object', {})
 
-        webhook = AdmissionWebhook()
-
-        valid, message = webhook.validate_cost_optimization(obj)
-        if not valid:
-            logger.warning(f"Validation failed: {message}")
-            return jsonify({
-                'apiVersion': 'admission.k8s.io/v1',
-                'kind': 'AdmissionReview',
-                'response': {
-                    'uid': req.get('uid'),
-                    'allowed': False,
-                    'status': {
-                        'code': 400,
-                        'message': message
-                    }
-                }
-            })
-
-        safe, message = webhook.prevent_dangerous_optimization(obj)
-        if not safe:
-            logger.warning(f"Safety check failed: {message}")
-            return jsonify({
+        allowed, code, message = AdmissionWebhook.check(obj)
+        if not allowed:
+            logger.warning(f"Admission denied: {message}")
+            return {
                 'apiVersion': 'admission.k8s.io/v1',
                 'kind': 'AdmissionReview',
                 'response': {
                     'uid': req.get('uid'),
                     'allowed': False,
                     'status': {
-                        'code': 403,
+                        'code': code,
                         'message': message
                     }
                 }
-            })
+            }
 
         logger.info(f"Validation passed for {obj.get('metadata', {}).get('name')}")
 
-        return jsonify({
-            'apiVersion': 'admission.k8s.io/v1',
-            'kind': 'AdmissionReview',
-            'response': {
-                'uid': req.get('uid'),
-                'allowed': True
-            }
-        })
+        return _render_review(_ALLOWED_REVIEW, req.get('uid'))
 
     except Exception as e:
         logger.error(f"Error in validation webhook: {str(e)}", exc_info=True)
-        return jsonify({
+        return ORJSONResponse(status_code=500, content={
             'apiVersion': 'admission.k8s.io/v1',
             'kind': 'AdmissionReview',
             'response': {
-                'uid': request.get_json().get('request', {}).get('uid'),
+                'uid': admission_review.get('request', {}).get('uid'),
                 'allowed': False,
                 'status': {
                     'code': 500,
                     'message': f'Internal error: {str(e)}'
                 }
             }
-        }), 500
+        })
 
 
-@app.route('/mutate', methods=['POST'])
-def mutate():
+@app.post('/mutate')
+async def mutate(request: Request):
+    admission_review = {}
     try:
-        admission_review = request.get_json()
+        admission_review = orjson.loads(await request.body())
 
         logger.info(f"Received mutation request: {admission_review.get('request', {}).get('uid')}")
 
         req = admission_review.get('request', {})
         obj = req.get('object', {})
 
-        patches = []
+        has_status = 'status' in obj
+        has_labels = 'labels' in obj.get('metadata', {})
 
-        if 'status' not in obj:
-            patches.append({
-                'op': 'add',
-                'path': '/status',
-                'value': {
-                    'phase': 'Pending',
-                    'message': 'CostOptimization created',
-                    'appliedOptimizations': 0,
-                    'totalSavings': 0.0,
-                    'conditions': []
-                }
-            })
-
-        metadata = obj.get('metadata', {})
-        if 'labels' not in metadata:
-            patches.append({
-                'op': 'add',
-                'path': '/metadata/labels',
-                'value': {}
-            })
-
-        patches.append({
-            'op': 'add',
-            'path': '/metadata/labels/app.kubernetes.io~1managed-by',
-            'value': 'cost-optimizer-operator'
-        })
+        if not has_status and not has_labels:
+            logger.info(f"Applying {len(_DEFAULT_PATCHES)} mutations")
+            return _render_review(_DEFAULT_MUTATION_REVIEW, req.get('uid'))
 
-        import base64
-        patch_json = json.dumps(patches)
-        patch_base64 = base64.b64encode(patch_json.encode()).decode()
+        patches = []
+        if not has_status:
+            patches.append(_STATUS_PATCH)
+        if not has_labels:
+            patches.append(_LABELS_PATCH)
+        patches.append(_MANAGED_BY_PATCH)
+        patch_base64 = base64.b64encode(orjson.dumps(patches)).decode('ascii')
 
         logger.info(f"Applying {len(patches)} mutations")
 
-        return jsonify({
+        return {
             'apiVersion': 'admission.k8s.io/v1',
             'kind': 'AdmissionReview',
             'response': {
@@ -230,24 +277,31 @@ def mutate():
                 'patchType': 'JSONPatch',
                 'patch': patch_base64
             }
-        })
+        }
 
     except Exception as e:
         logger.error(f"Error in mutation webhook: {str(e)}", exc_info=True)
-        return jsonify({
+        return {
             'apiVersion': 'admission.k8s.io/v1',
             'kind': 'AdmissionReview',
             'response': {
-                'uid': request.get_json().get('request', {}).get('uid'),
+                'uid': admission_review.get('request', {}).get('uid'),
                 'allowed': True
             }
-        })
+        }
 
 
-@app.route('/health', methods=['GET'])
-def health():
-    return jsonify({'status': 'healthy'}), 200
+@app.get('/health')
+async def health():
+    return {'status': 'healthy'}
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8443, ssl_context='adhoc')
+    import uvicorn
+    uvicorn.run(
+        app,
+        host='0.0.0.0',
+        port=WEBHOOK_PORT,
+        ssl_certfile=WEBHOOK_TLS_CERT,
+        ssl_keyfile=WEBHOOK_TLS_KEY
+    )
@@ -1,36 +1,99 @@
 import os
-import json
+import logging
 import csv
 import io
 import asyncio
-from typing import List
+import heapq
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager, suppress
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
-from fastapi import FastAPI, WebSocket, HTTPException, Response
+from fastapi import FastAPI, WebSocket, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import asyncpg
+import numpy as np
+import orjson
 
 from models import (
     CostSummary, OptimizationRecommendation, AnalysisRequest,
     OptimizeWorkloadRequest, ApplyRecommendationRequest, ApplyRecommendationResponse,
     SavingsHistory, Workload, WorkloadMetrics, MetricStats, ResourceSpec,
-    ClusterCostSummary, ExportFormat, CSVRow, TerraformExport, WebSocketUpdate
+    ClusterCostSummary, ExportFormat, CSVRow, TerraformExport, WebSocketUpdate,
+    utcnow
 )
 from optimizer.ml_engine import MLEngine
-from optimizer.cost_calculator import CostCalculator
-from optimizer.recommender import Recommender
+from optimizer.cost_calculator import CostCalculator, close_client
+from optimizer.recommender import Recommender, BY_MONTHLY_SAVINGS
+from optimizer.units import parse_cpu, parse_memory
 
 DB_HOST = os.getenv("POSTGRES_HOST", "postgres")
 DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB", "k8s_optimizer")
 DB_USER = os.getenv("POSTGRES_USER", "optimizer")
 DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "optimizer_dev_pass")
+DB_POOL_MIN_SIZE = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "5"))
+DB_POOL_MAX_SIZE = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "20"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("POSTGRES_STATEMENT_CACHE_SIZE", "100"))
+METRICS_INDEX_NAME = "idx_metrics_workload_timestamp_covering"
+METRICS_INDEX_INCLUDE = "INCLUDE (cpu_usage_cores, memory_usage_bytes)"
+RECOMMENDATION_CONCURRENCY = int(os.getenv("RECOMMENDATION_CONCURRENCY", "32"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "30"))
+CSV_EXPORT_BATCH_SIZE = 500
+# the summary keeps this many top recommendations, which also caps the exports
+TOP_RECOMMENDATIONS = 10
+
+
+logger = logging.getLogger(__name__)
+
+
+async def check_metrics_index(pool: asyncpg.Pool):
+    indexdef = await pool.fetchval(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = 'metrics' AND indexname = $1",
+        METRICS_INDEX_NAME
+    )
+    if not indexdef or METRICS_INDEX_INCLUDE not in indexdef:
+        logger.warning(
+            "Covering index %s on metrics(workload_id, timestamp DESC) %s is missing; "
+            "apply scripts/migrations/001_covering_metrics_index.sql or metric lookups "
+            "will fall back to heap fetches and sequential scans",
+            METRICS_INDEX_NAME, METRICS_INDEX_INCLUDE
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.pool = await asyncpg.create_pool(
+        host=DB_HOST,
+        port=int(DB_PORT),
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+        command_timeout=60
+    )
+    await check_metrics_index(app.state.pool)
+    broadcaster = asyncio.create_task(broadcast_loop())
+    try:
+        yield
+    finally:
+        broadcaster.cancel()
+        with suppress(asyncio.CancelledError):
+            await broadcaster
+        await close_client()
+        await app.state.pool.close()
+
 
 app = FastAPI(
     title="K8s Cost Optimizer API",
     description="ML-based cost optimization engine for Kubernetes workloads",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -47,244 +110,258 @@ recommender = Recommender(ml_engine, cost_calculator)
 
 active_websockets: List[WebSocket] = []
 
-
-def get_db_connection():
-    return psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD
+_summary_cache: Optional[Tuple[float, CostSummary]] = None
+_summary_lock = asyncio.Lock()
+
+
+def workload_from_row(row) -> Workload:
+    return Workload(
+        id=str(row["id"]),
+        cluster_id=str(row["cluster_id"]),
+        cluster_name=sys.intern(row["cluster_name"]),
+        namespace=sys.intern(row["namespace"]),
+        name=row["name"],
+        kind=sys.intern(row["kind"]),
+        replicas=row["replicas"],
+        provider=row["provider"],
+        current_resources=ResourceSpec(
+            cpu_request=row["cpu_request"],
+            memory_request=row["memory_request"],
+            cpu_limit=row["cpu_limit"],
+            memory_limit=row["memory_limit"]
+        )
     )
 
 
 async def fetch_workload_from_db(workload_id: str) -> Workload:
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    try:
-        cursor.execute("""
+    async with app.state.pool.acquire() as conn:
+        row = await conn.fetchrow("""
             SELECT w.*, c.name as cluster_name, c.provider
             FROM workloads w
             JOIN clusters c ON w.cluster_id = c.id
-            WHERE w.id = %s
-        """, (workload_id,))
-
-        row = cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail=f"Workload {workload_id} not found")
-
-        return Workload(
-            id=str(row["id"]),
-            cluster_id=str(row["cluster_id"]),
-            cluster_name=row["cluster_name"],
-            namespace=row["namespace"],
-            name=row["name"],
-            kind=row["kind"],
-            replicas=row["replicas"],
-            provider=row["provider"],
-            current_resources=ResourceSpec(
-                cpu_request=row["cpu_request"],
-                memory_request=row["memory_request"],
-                cpu_limit=row["cpu_limit"],
-                memory_limit=row["memory_limit"]
-            )
-        )
-    finally:
-        cursor.close()
-        conn.close()
+            WHERE w.id = $1
+        """, workload_id)
+
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Workload {workload_id} not found")
+
+    return workload_from_row(row)
+
+
+METRIC_AGGREGATES = """
+    AVG(cpu_usage_cores)::float8 as cpu_avg,
+    PERCENTILE_DISC(ARRAY[0.5, 0.95, 0.99]) WITHIN GROUP (ORDER BY cpu_usage_cores)::float8[] as cpu_percentiles,
+    MAX(cpu_usage_cores)::float8 as cpu_max,
+    MIN(cpu_usage_cores)::float8 as cpu_min,
+    AVG(memory_usage_bytes)::float8 as mem_avg,
+    PERCENTILE_DISC(ARRAY[0.5, 0.95, 0.99]) WITHIN GROUP (ORDER BY memory_usage_bytes)::float8[] as mem_percentiles,
+    MAX(memory_usage_bytes)::float8 as mem_max,
+    MIN(memory_usage_bytes)::float8 as mem_min,
+    COUNT(*) as sample_count
+"""
+
+NO_PERCENTILES = (0, 0, 0)
+
+
+def metrics_from_row(workload: Workload, row, hours: int) -> WorkloadMetrics:
+    cpu_request = parse_cpu(workload.current_resources.cpu_request)
+    memory_request = parse_memory(workload.current_resources.memory_request)
+
+    cpu_avg = row["cpu_avg"] or 0
+    mem_avg = row["mem_avg"] or 0
+    cpu_p50, cpu_p95, cpu_p99 = row["cpu_percentiles"] or NO_PERCENTILES
+    mem_p50, mem_p95, mem_p99 = row["mem_percentiles"] or NO_PERCENTILES
+    cpu_utilization = (cpu_avg / cpu_request * 100) if cpu_request > 0 else 0
+    memory_utilization = (mem_avg / memory_request * 100) if memory_request > 0 else 0
+
+    return WorkloadMetrics(
+        workload_id=workload.id,
+        cpu_usage=MetricStats(
+            avg=cpu_avg,
+            p50=cpu_p50 or 0,
+            p95=cpu_p95 or 0,
+            p99=cpu_p99 or 0,
+            max=row["cpu_max"] or 0,
+            min=row["cpu_min"] or 0
+        ),
+        memory_usage=MetricStats(
+            avg=mem_avg,
+            p50=mem_p50 or 0,
+            p95=mem_p95 or 0,
+            p99=mem_p99 or 0,
+            max=row["mem_max"] or 0,
+            min=row["mem_min"] or 0
+        ),
+        cpu_utilization_pct=cpu_utilization,
+        memory_utilization_pct=memory_utilization,
+        sample_count=row["sample_count"] or 0,
+        time_range_hours=hours
+    )
 
 
-async def fetch_workload_metrics(workload_id: str, hours: int = 168) -> WorkloadMetrics:
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+METRICS_SQL = f"""
+    SELECT {METRIC_AGGREGATES}
+    FROM metrics
+    WHERE workload_id = $1 AND timestamp >= $2
+"""
 
-    try:
-        cutoff = datetime.utcnow() - timedelta(hours=hours)
 
-        cursor.execute("""
-            SELECT
-                AVG(cpu_usage_cores) as cpu_avg,
-                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY cpu_usage_cores) as cpu_p50,
-                PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY cpu_usage_cores) as cpu_p95,
-                PERCENTILE_CONT(0.99) WITHIN GROUP (ORDER BY cpu_usage_cores) as cpu_p99,
-                MAX(cpu_usage_cores) as cpu_max,
-                MIN(cpu_usage_cores) as cpu_min,
-                AVG(memory_usage_bytes) as mem_avg,
-                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY memory_usage_bytes) as mem_p50,
-                PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY memory_usage_bytes) as mem_p95,
-                PERCENTILE_CONT(0.99) WITHIN GROUP (ORDER BY memory_usage_bytes) as mem_p99,
-                MAX(memory_usage_bytes) as mem_max,
-                MIN(memory_usage_bytes) as mem_min,
-                COUNT(*) as sample_count
-            FROM metrics
-            WHERE workload_id = %s AND timestamp >= %s
-        """, (workload_id, cutoff))
-
-        row = cursor.fetchone()
-
-        workload = await fetch_workload_from_db(workload_id)
-        cpu_request = ml_engine._parse_cpu(workload.current_resources.cpu_request)
-        memory_request = ml_engine._parse_memory(workload.current_resources.memory_request)
-
-        cpu_utilization = (row["cpu_avg"] / cpu_request * 100) if cpu_request > 0 else 0
-        memory_utilization = (row["mem_avg"] / memory_request * 100) if memory_request > 0 else 0
-
-        return WorkloadMetrics(
-            workload_id=workload_id,
-            cpu_usage=MetricStats(
-                avg=row["cpu_avg"] or 0,
-                p50=row["cpu_p50"] or 0,
-                p95=row["cpu_p95"] or 0,
-                p99=row["cpu_p99"] or 0,
-                max=row["cpu_max"] or 0,
-                min=row["cpu_min"] or 0
-            ),
-            memory_usage=MetricStats(
-                avg=row["mem_avg"] or 0,
-                p50=row["mem_p50"] or 0,
-                p95=row["mem_p95"] or 0,
-                p99=row["mem_p99"] or 0,
-                max=row["mem_max"] or 0,
-                min=row["mem_min"] or 0
-            ),
-            cpu_utilization_pct=cpu_utilization,
-            memory_utilization_pct=memory_utilization,
-            sample_count=row["sample_count"] or 0,
-            time_range_hours=hours
-        )
-    finally:
-        cursor.close()
-        conn.close()
+def db_timestamp(value: datetime) -> datetime:
+    # metrics and recommendations use TIMESTAMP without time zone (UTC)
+    return value.replace(tzinfo=None)
 
 
-@app.post("/analyze", response_model=CostSummary)
-async def analyze_all_workloads(request: AnalysisRequest = None):
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+async def fetch_workload_metrics(workload: Workload, hours: int = 168) -> WorkloadMetrics:
+    cutoff = db_timestamp(utcnow() - timedelta(hours=hours))
 
-    try:
-        query = """
+    async with app.state.pool.acquire() as conn:
+        row = await conn.fetchrow(METRICS_SQL, workload.id, cutoff)
+
+    return metrics_from_row(workload, row, hours)
+
+
+async def analyze_all_workloads(request: AnalysisRequest = None) -> CostSummary:
+    hours = 168
+    params = [db_timestamp(utcnow() - timedelta(hours=hours))]
+    filters = ""
+
+    if request and request.cluster_filter:
+        params.append(request.cluster_filter)
+        filters += f" AND c.name = ANY(${len(params)}::text[])"
+
+    if request and request.namespace_filter:
+        params.append(request.namespace_filter)
+        filters += f" AND w.namespace = ANY(${len(params)}::text[])"
+
+    query = f"""
+        WITH selected AS (
             SELECT w.*, c.name as cluster_name, c.provider
             FROM workloads w
             JOIN clusters c ON w.cluster_id = c.id
-            WHERE 1=1
-        """
-        params = []
-
-        if request and request.cluster_filter:
-            query += " AND c.name = ANY(%s)"
-            params.append(request.cluster_filter)
-
-        if request and request.namespace_filter:
-            query += " AND w.namespace = ANY(%s)"
-            params.append(request.namespace_filter)
-
-        cursor.execute(query, params)
-        workload_rows = cursor.fetchall()
-
-        all_recommendations = []
-        cluster_summaries = {}
-        total_current_cost = 0
-        total_optimized_cost = 0
-
-        for row in workload_rows:
-            workload = Workload(
-                id=str(row["id"]),
-                cluster_id=str(row["cluster_id"]),
-                cluster_name=row["cluster_name"],
-                namespace=row["namespace"],
-                name=row["name"],
-                kind=row["kind"],
-                replicas=row["replicas"],
-                provider=row["provider"],
-                current_resources=ResourceSpec(
-                    cpu_request=row["cpu_request"],
-                    memory_request=row["memory_request"],
-                    cpu_limit=row["cpu_limit"],
-                    memory_limit=row["memory_limit"]
-                )
+            WHERE 1=1{filters}
+        ),
+        m AS (
+            SELECT workload_id, {METRIC_AGGREGATES}
+            FROM metrics
+            WHERE timestamp >= $1 AND workload_id IN (SELECT id FROM selected)
+            GROUP BY workload_id
+        )
+        SELECT selected.*, m.*
+        FROM selected
+        LEFT JOIN m ON m.workload_id = selected.id
+    """
+
+    async with app.state.pool.acquire() as conn:
+        workload_rows = await conn.fetch(query, *params)
+
+    all_recommendations = []
+    cluster_summaries = defaultdict(lambda: {
+        "provider": None,
+        "workload_count": 0,
+        "recommendation_count": 0
+    })
+    by_type = defaultdict(float)
+
+    min_conf = request.min_confidence if request else 0.5
+    min_savings = request.min_savings_threshold if request else 0.0
+    allow_high_risk = request.include_high_risk if request else True
+    semaphore = asyncio.Semaphore(RECOMMENDATION_CONCURRENCY)
+
+    async def generate(workload: Workload, metrics: WorkloadMetrics):
+        async with semaphore:
+            return await recommender.generate_recommendations(
+                workload, metrics, min_conf, min_savings, allow_high_risk
             )
 
-            metrics = await fetch_workload_metrics(str(row["id"]))
-            min_conf = request.min_confidence if request else 0.5
-            recommendations = await recommender.generate_recommendations(workload, metrics, min_conf)
-
-            for rec in recommendations:
-                if request and request.min_savings_threshold:
-                    if rec.monthly_savings < request.min_savings_threshold:
-                        continue
-
-                if request and not request.include_high_risk:
-                    if rec.risk_assessment.level.value == "high":
-                        continue
-
-                all_recommendations.append(rec)
-                total_current_cost += rec.current_cost.monthly
-                total_optimized_cost += rec.optimized_cost.monthly
-
-                cluster = rec.cluster_name
-                if cluster not in cluster_summaries:
-                    cluster_summaries[cluster] = {
-                        "provider": workload.provider,
-                        "workload_count": 0,
-                        "current_cost": 0,
-                        "optimized_cost": 0,
-                        "recommendations": []
-                    }
-
-                cluster_summaries[cluster]["workload_count"] += 1
-                cluster_summaries[cluster]["current_cost"] += rec.current_cost.monthly
-                cluster_summaries[cluster]["optimized_cost"] += rec.optimized_cost.monthly
-                cluster_summaries[cluster]["recommendations"].append(rec)
-
-        all_recommendations.sort(key=lambda r: r.monthly_savings, reverse=True)
-        top_recommendations = all_recommendations[:10]
-
-        cluster_summaries_list = []
-        for cluster_name, data in cluster_summaries.items():
-            savings = data["current_cost"] - data["optimized_cost"]
-            cluster_summaries_list.append(
-                ClusterCostSummary(
-                    cluster_name=cluster_name,
-                    provider=data["provider"],
-                    workload_count=data["workload_count"],
-                    current_monthly_cost=data["current_cost"],
-                    optimized_monthly_cost=data["optimized_cost"],
-                    potential_monthly_savings=savings,
-                    savings_percentage=(savings / data["current_cost"] * 100) if data["current_cost"] > 0 else 0,
-                    recommendation_count=len(data["recommendations"])
-                )
+    workloads = [workload_from_row(row) for row in workload_rows]
+    results = await asyncio.gather(*(
+        generate(workload, metrics_from_row(workload, row, hours))
+        for workload, row in zip(workloads, workload_rows)
+    ))
+
+    for workload, recommendations in zip(workloads, results):
+        for rec in recommendations:
+            all_recommendations.append(rec)
+
+            cluster = cluster_summaries[rec.cluster_name]
+            cluster["provider"] = workload.provider.value
+            cluster["workload_count"] += 1
+            cluster["recommendation_count"] += 1
+
+            by_type[rec.optimization_type.value] += rec.monthly_savings
+
+    top_recommendations = heapq.nlargest(TOP_RECOMMENDATIONS, all_recommendations, key=BY_MONTHLY_SAVINGS)
+
+    count = len(all_recommendations)
+    current_costs = np.fromiter((r.current_cost.monthly for r in all_recommendations), dtype=np.float64, count=count)
+    optimized_costs = np.fromiter((r.optimized_cost.monthly for r in all_recommendations), dtype=np.float64, count=count)
+
+    cluster_index = {name: i for i, name in enumerate(cluster_summaries)}
+    cluster_ids = np.fromiter((cluster_index[r.cluster_name] for r in all_recommendations), dtype=np.intp, count=count)
+    cluster_current = np.bincount(cluster_ids, weights=current_costs, minlength=len(cluster_index))
+    cluster_optimized = np.bincount(cluster_ids, weights=optimized_costs, minlength=len(cluster_index))
+
+    cluster_summaries_list = []
+    for cluster_name, data in cluster_summaries.items():
+        i = cluster_index[cluster_name]
+        current_cost = float(cluster_current[i])
+        optimized_cost = float(cluster_optimized[i])
+        savings = current_cost - optimized_cost
+        cluster_summaries_list.append(
+            ClusterCostSummary(
+                cluster_name=cluster_name,
+                provider=data["provider"],
+                workload_count=data["workload_count"],
+                current_monthly_cost=current_cost,
+                optimized_monthly_cost=optimized_cost,
+                potential_monthly_savings=savings,
+                savings_percentage=(savings / current_cost * 100) if current_cost > 0 else 0,
+                recommendation_count=data["recommendation_count"]
             )
-
-        by_type = {}
-        for rec in all_recommendations:
-            opt_type = rec.optimization_type.value
-            by_type[opt_type] = by_type.get(opt_type, 0) + rec.monthly_savings
-
-        total_savings = total_current_cost - total_optimized_cost
-
-        return CostSummary(
-            total_workloads=len(workload_rows),
-            total_current_monthly_cost=total_current_cost,
-            total_optimized_monthly_cost=total_optimized_cost,
-            total_potential_monthly_savings=total_savings,
-            total_potential_yearly_savings=total_savings * 12,
-            overall_savings_percentage=(total_savings / total_current_cost * 100) if total_current_cost > 0 else 0,
-            clusters=cluster_summaries_list,
-            top_recommendations=top_recommendations,
-            by_optimization_type=by_type
         )
 
-    finally:
-        cursor.close()
-        conn.close()
+    total_current_cost = float(current_costs.sum())
+    total_optimized_cost = float(optimized_costs.sum())
+    total_savings = total_current_cost - total_optimized_cost
+
+    return CostSummary(
+        total_workloads=len(workload_rows),
+        total_current_monthly_cost=total_current_cost,
+        total_optimized_monthly_cost=total_optimized_cost,
+        total_potential_monthly_savings=total_savings,
+        total_potential_yearly_savings=total_savings * 12,
+        overall_savings_percentage=(total_savings / total_current_cost * 100) if total_current_cost > 0 else 0,
+        clusters=cluster_summaries_list,
+        top_recommendations=top_recommendations,
+        by_optimization_type=dict(by_type)
+    )
+
+
+@app.post("/analyze", responses={200: {"model": CostSummary}})
+async def analyze(request: AnalysisRequest = None):
+    summary = await analyze_all_workloads(request)
+    return Response(content=summary.model_dump_json(), media_type="application/json")
+
+
+async def get_cached_summary(ttl: float = SUMMARY_CACHE_TTL) -> CostSummary:
+    global _summary_cache
+
+    if _summary_cache and time.monotonic() - _summary_cache[0] < ttl:
+        return _summary_cache[1]
+
+    async with _summary_lock:
+        if _summary_cache and time.monotonic() - _summary_cache[0] < ttl:
+            return _summary_cache[1]
+
+        summary = await analyze_all_workloads()
+        _summary_cache = (time.monotonic(), summary)
+        return summary
 
 
 @app.post("/optimize/{workload_id}")
 async def optimize_workload(workload_id: str, request: OptimizeWorkloadRequest = None):
     workload = await fetch_workload_from_db(workload_id)
-    metrics = await fetch_workload_metrics(workload_id)
+    metrics = await fetch_workload_metrics(workload)
 
     min_conf = request.min_confidence if request else 0.6
     recommendations = await recommender.generate_recommendations(workload, metrics, min_conf)
@@ -315,23 +392,16 @@ async def get_recommendations(
     min_confidence: float = 0.5,
     limit: int = 100
 ):
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    try:
-        cursor.execute("""
+    async with app.state.pool.acquire() as conn:
+        rows = await conn.fetch("""
             SELECT * FROM recommendations
-            WHERE estimated_savings >= %s AND confidence_score >= %s
+            WHERE estimated_savings >= $1 AND confidence_score >= $2
             ORDER BY estimated_savings DESC
-            LIMIT %s
-        """, (min_savings, min_confidence, limit))
+            LIMIT $3
+        """, min_savings, min_confidence, limit)
 
-        recommendations = cursor.fetchall()
-        return {"recommendations": recommendations, "count": len(recommendations)}
-
-    finally:
-        cursor.close()
-        conn.close()
+    recommendations = [dict(row) for row in rows]
+    return {"recommendations": recommendations, "count": len(recommendations)}
 
 
 @app.post("/apply/{recommendation_id}")
@@ -350,50 +420,44 @@ async def apply_recommendation(
         recommendation_id=recommendation_id,
         status="applied",
         message="Recommendation applied successfully",
-        applied_at=datetime.utcnow()
+        applied_at=utcnow()
     )
 
 
 @app.get("/savings/history")
 async def get_savings_history(days: int = 30):
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-    try:
-        cutoff = datetime.utcnow() - timedelta(days=days)
+    now = utcnow()
+    cutoff = now - timedelta(days=days)
 
-        cursor.execute("""
+    async with app.state.pool.acquire() as conn:
+        row = await conn.fetchrow("""
             SELECT
-                COUNT(*) FILTER (WHERE created_at >= %s) as generated,
-                COUNT(*) FILTER (WHERE status = 'applied' AND applied_at >= %s) as applied,
-                COALESCE(SUM(estimated_savings) FILTER (WHERE created_at >= %s), 0) as potential,
-                COALESCE(SUM(estimated_savings) FILTER (WHERE status = 'applied' AND applied_at >= %s), 0) as realized
+                COUNT(*) FILTER (WHERE created_at >= $1) as generated,
+                COUNT(*) FILTER (WHERE status = 'applied' AND applied_at >= $1) as applied,
+                COALESCE(SUM(estimated_savings) FILTER (WHERE created_at >= $1), 0) as potential,
+                COALESCE(SUM(estimated_savings) FILTER (WHERE status = 'applied' AND applied_at >= $1), 0) as realized
             FROM recommendations
-        """, (cutoff, cutoff, cutoff, cutoff))
-
-        row = cursor.fetchone()
-
-        realized = float(row["realized"]) if row["realized"] else 0
-        potential = float(row["potential"]) if row["potential"] else 0
-
-        return SavingsHistory(
-            period_start=cutoff,
-            period_end=datetime.utcnow(),
-            total_recommendations_generated=row["generated"] or 0,
-            recommendations_applied=row["applied"] or 0,
-            potential_savings=potential,
-            realized_savings=realized,
-            realization_rate=(realized / potential * 100) if potential > 0 else 0
-        )
-
-    finally:
-        cursor.close()
-        conn.close()
+        """, db_timestamp(cutoff))
+
+    realized = float(row["realized"]) if row["realized"] else 0
+    potential = float(row["potential"]) if row["potential"] else 0
+
+    return SavingsHistory(
+        period_start=cutoff,
+        period_end=now,
+        total_recommendations_generated=row["generated"] or 0,
+        recommendations_applied=row["applied"] or 0,
+        potential_savings=potential,
+        realized_savings=realized,
+        realization_rate=(realized / potential * 100) if potential > 0 else 0
+    )
 
 
 @app.post("/export/terraform")
-async def export_terraform():
-    summary = await analyze_all_workloads()
+async def export_terraform(
+    top_n: int = Query(5, ge=1, le=TOP_RECOMMENDATIONS, description="Number of top recommendations to export (at most 10)")
+):
+    summary = await get_cached_summary()
 
     terraform_config = {
         "terraform": {
@@ -402,7 +466,7 @@ async def export_terraform():
         "resource": {}
     }
 
-    for rec in summary.top_recommendations[:5]:
+    for rec in summary.top_recommendations[:top_n]:
         resource_name = f"k8s_deployment_{rec.workload_name.replace('-', '_')}"
         terraform_config["resource"][resource_name] = {
             "metadata": {
@@ -427,70 +491,130 @@ async def export_terraform():
         }
 
     return Response(
-        content=json.dumps(terraform_config, indent=2),
+        content=orjson.dumps(terraform_config, option=orjson.OPT_INDENT_2),
         media_type="application/json",
         headers={"Content-Disposition": "attachment; filename=terraform.tf.json"}
     )
 
 
 @app.get("/export/csv")
-async def export_csv():
-    summary = await analyze_all_workloads()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
+async def export_csv(
+    top_n: int = Query(TOP_RECOMMENDATIONS, ge=1, le=TOP_RECOMMENDATIONS, description="Number of top recommendations to export (at most 10)")
+):
+    summary = await get_cached_summary()
 
-    writer.writerow([
-        "Cluster", "Namespace", "Workload", "Optimization Type",
-        "Current Monthly Cost", "Optimized Monthly Cost", "Monthly Savings",
-        "Savings %", "Confidence Score", "Risk Level", "Status"
-    ])
+    async def generate_rows():
+        output = io.StringIO()
+        writer = csv.writer(output)
 
-    for rec in summary.top_recommendations:
         writer.writerow([
-            rec.cluster_name,
-            rec.namespace,
-            rec.workload_name,
-            rec.optimization_type.value,
-            f"${rec.current_cost.monthly:.2f}",
-            f"${rec.optimized_cost.monthly:.2f}",
-            f"${rec.monthly_savings:.2f}",
-            f"{rec.savings_percentage:.1f}%",
-            f"{rec.confidence_score:.2f}",
-            rec.risk_assessment.level.value,
-            rec.status
+            "Cluster", "Namespace", "Workload", "Optimization Type",
+            "Current Monthly Cost", "Optimized Monthly Cost", "Monthly Savings",
+            "Savings %", "Confidence Score", "Risk Level", "Status"
         ])
 
+        for i, rec in enumerate(summary.top_recommendations[:top_n], 1):
+            writer.writerow([
+                rec.cluster_name,
+                rec.namespace,
+                rec.workload_name,
+                rec.optimization_type.value,
+                f"${rec.current_cost.monthly:.2f}",
+                f"${rec.optimized_cost.monthly:.2f}",
+                f"${rec.monthly_savings:.2f}",
+                f"{rec.savings_percentage:.1f}%",
+                f"{rec.confidence_score:.2f}",
+                rec.risk_assessment.level.value,
+                rec.status
+            ])
+
+            if i % CSV_EXPORT_BATCH_SIZE == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+
+        yield output.getvalue()
+
     return StreamingResponse(
-        iter([output.getvalue()]),
+        generate_rows(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=cost_optimization_recommendations.csv"}
     )
 
 
+WEBSOCKET_BROADCAST_INTERVAL = 30
+WEBSOCKET_SEND_TIMEOUT = 5.0
+
+
+async def safe_send(websocket: WebSocket, payload: str) -> bool:
+    try:
+        await asyncio.wait_for(websocket.send_text(payload), timeout=WEBSOCKET_SEND_TIMEOUT)
+        return True
+    except Exception:
+        return False
+
+
+def summary_update_payload(summary: CostSummary) -> str:
+    now = utcnow()
+    update = WebSocketUpdate(
+        event_type="optimization_update",
+        data={
+            "total_savings": summary.total_potential_monthly_savings,
+            "recommendation_count": len(summary.top_recommendations),
+            "timestamp": now.isoformat()
+        },
+        timestamp=now
+    )
+    return update.model_dump_json()
+
+
+async def broadcast_loop():
+    while True:
+        await asyncio.sleep(WEBSOCKET_BROADCAST_INTERVAL)
+        if not active_websockets:
+            continue
+
+        try:
+            summary = await get_cached_summary()
+        except Exception:
+            logger.exception("Failed to build optimization summary for WebSocket broadcast")
+            continue
+
+        payload = summary_update_payload(summary)
+
+        clients = list(active_websockets)
+        results = await asyncio.gather(
+            *(safe_send(ws, payload) for ws in clients),
+            return_exceptions=True
+        )
+        for ws, sent in zip(clients, results):
+            if sent is not True and ws in active_websockets:
+                active_websockets.remove(ws)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_websockets.append(websocket)
 
+    # new clients get the current summary right away instead of waiting for the next broadcast
     try:
-        while True:
-            summary = await analyze_all_workloads()
-
-            update = WebSocketUpdate(
-                event_type="optimization_update",
-                data={
-                    "total_savings": summary.total_potential_monthly_savings,
-                    "recommendation_count": len(summary.top_recommendations),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            )
+        summary = await get_cached_summary()
+    except Exception:
+        logger.exception("Failed to build optimization summary for new WebSocket client")
+    else:
+        if not await safe_send(websocket, summary_update_payload(summary)):
+            return
 
-            await websocket.send_json(update.dict())
-            await asyncio.sleep(30)
+    active_websockets.append(websocket)
 
-    except Exception as e:
-        active_websockets.remove(websocket)
+    try:
+        while True:
+            await websocket.receive_text()
+    except Exception:
+        pass
+    finally:
+        if websocket in active_websockets:
+            active_websockets.remove(websocket)
 
 
 @app.get("/health")
@@ -500,4 +624,4 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop")
@@ -1,9 +1,29 @@
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
-from datetime import datetime
+import re
+from functools import cached_property
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime, timezone
 from enum import Enum
 
 
+_WORKLOAD_TAG_RE = re.compile(r"database|db|api|gateway")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Provider(str, Enum):
+    AWS = "aws"
+    GCP = "gcp"
+    AZURE = "azure"
+
+
+# clusters.provider is free text; unrecognised values are priced like AWS, the pricing default
+DEFAULT_PROVIDER = Provider.AWS
+_PROVIDERS = {provider.value: provider for provider in Provider}
+
+
 class ExportFormat(str, Enum):
     YAML = "yaml"
     TERRAFORM = "terraform"
@@ -33,6 +53,8 @@ class Cluster(BaseModel):
 
 
 class ResourceSpec(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     cpu_request: str
     memory_request: str
     cpu_limit: str
@@ -48,10 +70,23 @@ class Workload(BaseModel):
     kind: str
     replicas: int
     current_resources: ResourceSpec
-    provider: str
+    provider: Provider
+
+    @field_validator("provider", mode="before")
+    @classmethod
+    def normalize_provider(cls, value):
+        if isinstance(value, str):
+            return _PROVIDERS.get(value.lower(), DEFAULT_PROVIDER)
+        return value
+
+    @cached_property
+    def workload_tags(self) -> FrozenSet[str]:
+        return frozenset(_WORKLOAD_TAG_RE.findall(self.name.lower()))
 
 
 class MetricStats(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     avg: float
     p50: float
     p95: float
@@ -71,6 +106,8 @@ class WorkloadMetrics(BaseModel):
 
 
 class CostBreakdown(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     compute: float = Field(ge=0)
     memory: float = Field(ge=0)
     storage: float = Field(ge=0)
@@ -94,14 +131,18 @@ class RiskLevel(str, Enum):
 
 
 class RiskAssessment(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     level: RiskLevel
     score: float = Field(ge=0, le=1.0)
-    factors: List[str]
-    mitigation_steps: List[str]
+    factors: Tuple[str, ...]
+    mitigation_steps: Tuple[str, ...]
 
 
 class RollbackPlan(BaseModel):
-    steps: List[str]
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    steps: Tuple[str, ...]
     estimated_time_minutes: int
     automation_available: bool
 
@@ -129,7 +170,7 @@ class OptimizationRecommendation(BaseModel):
     implementation_complexity: str
     estimated_implementation_time: str
     status: str = "pending"
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
 
 
 class OptimizationResult(BaseModel):
@@ -137,7 +178,7 @@ class OptimizationResult(BaseModel):
     metrics: WorkloadMetrics
     recommendations: List[OptimizationRecommendation]
     total_potential_savings: float = Field(ge=0)
-    analysis_timestamp: datetime = Field(default_factory=datetime.utcnow)
+    analysis_timestamp: datetime = Field(default_factory=utcnow)
 
 
 class ClusterCostSummary(BaseModel):
@@ -161,7 +202,7 @@ class CostSummary(BaseModel):
     clusters: List[ClusterCostSummary]
     top_recommendations: List[OptimizationRecommendation]
     by_optimization_type: Dict[str, float]
-    analysis_timestamp: datetime = Field(default_factory=datetime.utcnow)
+    analysis_timestamp: datetime = Field(default_factory=utcnow)
 
 
 class SavingsHistory(BaseModel):
@@ -225,5 +266,5 @@ class OptimizeWorkloadRequest(BaseModel):
 
 class WebSocketUpdate(BaseModel):
     event_type: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utcnow)
     data: Dict
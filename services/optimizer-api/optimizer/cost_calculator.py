@@ -1,7 +1,73 @@
 import os
+import asyncio
+import random
+import time
 import httpx
-from typing import Dict, List
-from models import Workload, CostEstimate, CostBreakdown
+import orjson
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+from models import Workload, CostEstimate, CostBreakdown, Provider
+from optimizer.units import parse_cpu, parse_memory
+
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "600"))
+PRICE_CACHE_MAX_ENTRIES = 4096
+PRICING_BATCH_SIZE = 32
+PRICING_CONCURRENCY = int(os.getenv("PRICING_CONCURRENCY", "20"))
+PRICING_RETRIES = int(os.getenv("PRICING_RETRIES", "2"))
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout)
+JSON_HEADERS = {"content-type": "application/json"}
+# compute, memory, storage, network share of a fallback estimate
+FALLBACK_BREAKDOWN_RATIOS = (0.7, 0.2, 0.05, 0.05)
+
+_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(
+        connect=float(os.getenv("PRICING_CONNECT_TIMEOUT", "3")),
+        read=float(os.getenv("PRICING_READ_TIMEOUT", "5")),
+        write=5.0,
+        pool=5.0
+    ),
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+)
+
+
+async def close_client():
+    await _client.aclose()
+
+
+# (max cpu cores, max memory GB, instance type), smallest first; the last entry is the catch-all
+INSTANCE_TIERS = {
+    Provider.AWS: [
+        (0.5, 1, "t3.micro"),
+        (1, 2, "t3.small"),
+        (2, 4, "t3.medium"),
+        (2, 8, "m5.large"),
+        (4, 16, "m5.xlarge"),
+        (float("inf"), float("inf"), "m5.2xlarge"),
+    ],
+    Provider.GCP: [
+        (0.5, 1, "e2-micro"),
+        (1, 2, "e2-small"),
+        (2, 4, "e2-medium"),
+        (2, 8, "n2-standard-2"),
+        (4, 16, "n2-standard-4"),
+        (float("inf"), float("inf"), "n2-standard-8"),
+    ],
+    Provider.AZURE: [
+        (1, 1, "B1s"),
+        (2, 4, "B2s"),
+        (2, 8, "Standard_D2s_v3"),
+        (4, 16, "Standard_D4s_v3"),
+        (float("inf"), float("inf"), "Standard_D8s_v3"),
+    ],
+}
+
+
+def pick_instance_type(provider: Provider, cpu_cores: float, memory_gb: float) -> str:
+    tiers = INSTANCE_TIERS[provider]
+    for max_cpu, max_memory, instance_type in tiers:
+        if cpu_cores <= max_cpu and memory_gb <= max_memory:
+            return instance_type
+    return tiers[-1][2]
 
 
 class CostCalculator:
@@ -10,161 +76,263 @@ class CostCalculator:
         self.aws_pricing_url = os.getenv("AWS_PRICING_URL", "http://aws-pricing-api:8000")
         self.gcp_pricing_url = os.getenv("GCP_PRICING_URL", "http://gcp-pricing-api:8000")
         self.azure_pricing_url = os.getenv("AZURE_PRICING_URL", "http://azure-pricing-api:8000")
-        self.client = httpx.AsyncClient(timeout=30.0)
-
-    def _get_pricing_url(self, provider: str) -> str:
-        urls = {
-            "aws": self.aws_pricing_url,
-            "gcp": self.gcp_pricing_url,
-            "azure": self.azure_pricing_url
-        }
-        return urls.get(provider.lower(), self.aws_pricing_url)
-
-    def _parse_cpu(self, cpu_string: str) -> float:
-        if cpu_string.endswith('m'):
-            return float(cpu_string[:-1]) / 1000
-        return float(cpu_string)
-
-    def _parse_memory(self, memory_string: str) -> int:
-        multipliers = {
-            'Ki': 1024,
-            'Mi': 1024 * 1024,
-            'Gi': 1024 * 1024 * 1024,
-            'K': 1000,
-            'M': 1000 * 1000,
-            'G': 1000 * 1000 * 1000
+        self._urls = {
+            Provider.AWS: self.aws_pricing_url,
+            Provider.GCP: self.gcp_pricing_url,
+            Provider.AZURE: self.azure_pricing_url
         }
-        for suffix, multiplier in multipliers.items():
-            if memory_string.endswith(suffix):
-                return int(float(memory_string[:-len(suffix)]) * multiplier)
-        return int(memory_string)
-
-    async def fetch_current_costs(self, workload: Workload, instance_type: str = None) -> CostEstimate:
-        provider = workload.provider.lower()
-        pricing_url = self._get_pricing_url(provider)
-
-        if not instance_type:
-            instance_type = self._infer_instance_type(workload, provider)
-
-        cpu_cores = self._parse_cpu(workload.current_resources.cpu_request)
-        memory_gb = self._parse_memory(workload.current_resources.memory_request) / (1024 ** 3)
+        self.client = _client
+        self._sem = asyncio.Semaphore(PRICING_CONCURRENCY)
+        self._price_cache: OrderedDict = OrderedDict()
+
+    def _get_pricing_url(self, provider: Provider) -> str:
+        return self._urls[provider]
+
+    def _price_cache_key(self, pricing_url: str, request_data: Dict) -> Tuple:
+        return (
+            pricing_url,
+            request_data["instance_type"],
+            round(request_data["cpu_cores"], 3),
+            round(request_data["memory_gb"], 3),
+            request_data["region"]
+        )
 
-        request_data = {
+    def _get_cached_pricing(self, key: Tuple) -> Optional[Dict]:
+        cached = self._price_cache.get(key)
+        if cached and time.monotonic() - cached[0] < PRICE_CACHE_TTL:
+            self._price_cache.move_to_end(key)
+            return cached[1]
+        return None
+
+    def _cache_pricing(self, key: Tuple, pricing_data: Dict):
+        self._price_cache[key] = (time.monotonic(), pricing_data)
+        self._price_cache.move_to_end(key)
+        if len(self._price_cache) > PRICE_CACHE_MAX_ENTRIES:
+            self._price_cache.popitem(last=False)
+
+    async def _fetch_pricing(self, pricing_url: str, request_data: Dict) -> Dict:
+        key = self._price_cache_key(pricing_url, request_data)
+        pricing_data = self._get_cached_pricing(key)
+        if pricing_data is not None:
+            return pricing_data
+
+        pricing_data = await self._post_json(f"{pricing_url}/pricing", request_data)
+
+        self._cache_pricing(key, pricing_data)
+        return pricing_data
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        for attempt in range(PRICING_RETRIES + 1):
+            try:
+                async with self._sem:
+                    response = await self.client.request(method, url, **kwargs)
+                response.raise_for_status()
+                return response
+            except RETRYABLE_ERRORS:
+                if attempt == PRICING_RETRIES:
+                    raise
+                await asyncio.sleep(0.05 * 2 ** attempt + random.random() * 0.05)
+
+    async def _post_json(self, url: str, payload: Dict) -> Dict:
+        response = await self._send("POST", url, content=orjson.dumps(payload), headers=JSON_HEADERS)
+        return orjson.loads(response.content)
+
+    def _pricing_request(self, workload: Workload, instance_type: str) -> Dict:
+        return {
             "instance_type": instance_type,
-            "cpu_cores": cpu_cores,
-            "memory_gb": memory_gb,
+            "cpu_cores": parse_cpu(workload.current_resources.cpu_request),
+            "memory_gb": parse_memory(workload.current_resources.memory_request) / (1024 ** 3),
             "storage_gb": 10,
             "network_gb": 50,
             "hours": 730,
             "region": "us-east-1"
         }
 
+    def _cost_estimate(self, pricing_data: Dict, replicas: int) -> CostEstimate:
+        breakdown = CostBreakdown(
+            compute=pricing_data["breakdown"]["compute"],
+            memory=pricing_data["breakdown"]["memory"],
+            storage=pricing_data["breakdown"]["storage"],
+            network=pricing_data["breakdown"]["network"],
+            total=pricing_data["breakdown"]["total"]
+        )
+
+        monthly_cost = pricing_data["monthly_cost"] * replicas
+
+        return CostEstimate(
+            hourly=pricing_data["hourly_cost"] * replicas,
+            daily=monthly_cost / 30,
+            monthly=monthly_cost,
+            yearly=monthly_cost * 12,
+            breakdown=breakdown
+        )
+
+    async def fetch_current_costs(
+        self,
+        workload: Workload,
+        instance_type: str = None,
+        provider: Optional[Provider] = None
+    ) -> CostEstimate:
+        provider = provider or workload.provider
+        pricing_url = self._get_pricing_url(provider)
+
+        if not instance_type:
+            instance_type = self._infer_instance_type(workload, provider)
+
+        request_data = self._pricing_request(workload, instance_type)
+
         try:
-            response = await self.client.post(f"{pricing_url}/pricing", json=request_data)
-            response.raise_for_status()
-            pricing_data = response.json()
-
-            breakdown = CostBreakdown(
-                compute=pricing_data["breakdown"]["compute"],
-                memory=pricing_data["breakdown"]["memory"],
-                storage=pricing_data["breakdown"]["storage"],
-                network=pricing_data["breakdown"]["network"],
-                total=pricing_data["breakdown"]["total"]
+            pricing_data = await self._fetch_pricing(pricing_url, request_data)
+            return self._cost_estimate(pricing_data, workload.replicas)
+
+        except Exception as e:
+            return self._fallback_cost_estimate(
+                request_data["cpu_cores"], request_data["memory_gb"], workload.replicas
             )
 
-            monthly_cost = pricing_data["monthly_cost"] * workload.replicas
+    async def fetch_costs_many(self, workloads: List[Workload]) -> List[CostEstimate]:
+        return await self.fetch_costs_bulk([(workload, None, None) for workload in workloads])
 
-            return CostEstimate(
-                hourly=pricing_data["hourly_cost"] * workload.replicas,
-                daily=monthly_cost / 30,
-                monthly=monthly_cost,
-                yearly=monthly_cost * 12,
-                breakdown=breakdown
+    async def fetch_costs_bulk(
+        self,
+        specs: List[Tuple[Workload, Optional[str], Optional[Provider]]]
+    ) -> List[CostEstimate]:
+        requests = []
+        for workload, instance_type, provider in specs:
+            provider = provider or workload.provider
+            request_data = self._pricing_request(
+                workload, instance_type or self._infer_instance_type(workload, provider)
             )
+            requests.append((self._get_pricing_url(provider), request_data, workload.replicas))
+
+        return await self._price_all(requests)
+
+    async def _price_all(self, requests: List[Tuple[str, Dict, int]]) -> List[CostEstimate]:
+        results: List[Optional[CostEstimate]] = [None] * len(requests)
+        pending = defaultdict(list)
+
+        for i, (pricing_url, request_data, replicas) in enumerate(requests):
+            pricing_data = self._get_cached_pricing(self._price_cache_key(pricing_url, request_data))
+            if pricing_data is not None:
+                results[i] = self._cost_estimate(pricing_data, replicas)
+            else:
+                pending[pricing_url].append((i, request_data, replicas))
+
+        batches = [
+            (pricing_url, items[start:start + PRICING_BATCH_SIZE])
+            for pricing_url, items in pending.items()
+            for start in range(0, len(items), PRICING_BATCH_SIZE)
+        ]
+        await asyncio.gather(*(
+            self._fetch_pricing_batch(pricing_url, batch, results)
+            for pricing_url, batch in batches
+        ))
+
+        return results
+
+    async def _fetch_pricing_batch(
+        self,
+        pricing_url: str,
+        batch: List[Tuple[int, Dict, int]],
+        results: List[Optional[CostEstimate]]
+    ):
+        try:
+            priced = (await self._post_json(
+                f"{pricing_url}/pricing/batch",
+                {"requests": [request_data for _, request_data, _ in batch]}
+            ))["results"]
+            if len(priced) != len(batch):
+                raise ValueError(f"expected {len(batch)} pricing results, got {len(priced)}")
+
+            for (i, request_data, replicas), pricing_data in zip(batch, priced):
+                self._cache_pricing(self._price_cache_key(pricing_url, request_data), pricing_data)
+                results[i] = self._cost_estimate(pricing_data, replicas)
 
         except Exception as e:
-            return self._fallback_cost_estimate(workload)
+            # one bad item fails the whole batch, so price each item on its own
+            await asyncio.gather(*(
+                self._fetch_pricing_single(pricing_url, item, results) for item in batch
+            ))
 
-    async def calculate_optimized_costs(
+    async def _fetch_pricing_single(
+        self,
+        pricing_url: str,
+        item: Tuple[int, Dict, int],
+        results: List[Optional[CostEstimate]]
+    ):
+        i, request_data, replicas = item
+        try:
+            pricing_data = await self._fetch_pricing(pricing_url, request_data)
+            results[i] = self._cost_estimate(pricing_data, replicas)
+
+        except Exception as e:
+            results[i] = self._fallback_cost_estimate(
+                request_data["cpu_cores"], request_data["memory_gb"], replicas
+            )
+
+    def _optimized_request(
         self,
         workload: Workload,
         recommended_config: Dict,
         instance_type: str = None
-    ) -> CostEstimate:
-        provider = workload.provider.lower()
-        pricing_url = self._get_pricing_url(provider)
+    ) -> Tuple[str, Dict, int]:
+        provider = workload.provider
 
         if not instance_type:
             instance_type = self._infer_instance_type_from_config(recommended_config, provider)
 
-        cpu_cores = self._parse_cpu(recommended_config.get("cpu_request", workload.current_resources.cpu_request))
-        memory_gb = self._parse_memory(recommended_config.get("memory_request", workload.current_resources.memory_request)) / (1024 ** 3)
-        replicas = recommended_config.get("replicas", workload.replicas)
-
         request_data = {
             "instance_type": instance_type,
-            "cpu_cores": cpu_cores,
-            "memory_gb": memory_gb,
+            "cpu_cores": parse_cpu(recommended_config.get("cpu_request", workload.current_resources.cpu_request)),
+            "memory_gb": parse_memory(recommended_config.get("memory_request", workload.current_resources.memory_request)) / (1024 ** 3),
             "storage_gb": 10,
             "network_gb": 50,
             "hours": 730,
             "region": "us-east-1"
         }
 
-        try:
-            response = await self.client.post(f"{pricing_url}/pricing", json=request_data)
-            response.raise_for_status()
-            pricing_data = response.json()
-
-            breakdown = CostBreakdown(
-                compute=pricing_data["breakdown"]["compute"],
-                memory=pricing_data["breakdown"]["memory"],
-                storage=pricing_data["breakdown"]["storage"],
-                network=pricing_data["breakdown"]["network"],
-                total=pricing_data["breakdown"]["total"]
-            )
+        return self._get_pricing_url(provider), request_data, recommended_config.get("replicas", workload.replicas)
 
-            monthly_cost = pricing_data["monthly_cost"] * replicas
+    async def calculate_optimized_costs(
+        self,
+        workload: Workload,
+        recommended_config: Dict,
+        instance_type: str = None
+    ) -> CostEstimate:
+        pricing_url, request_data, replicas = self._optimized_request(workload, recommended_config, instance_type)
 
-            return CostEstimate(
-                hourly=pricing_data["hourly_cost"] * replicas,
-                daily=monthly_cost / 30,
-                monthly=monthly_cost,
-                yearly=monthly_cost * 12,
-                breakdown=breakdown
-            )
+        try:
+            pricing_data = await self._fetch_pricing(pricing_url, request_data)
+            return self._cost_estimate(pricing_data, replicas)
 
         except Exception as e:
-            return self._fallback_optimized_cost_estimate(workload, recommended_config)
-
-    async def compare_providers(self, workload: Workload, instance_type: str = None) -> Dict[str, CostEstimate]:
-        results = {}
+            return self._fallback_cost_estimate(request_data["cpu_cores"], request_data["memory_gb"], replicas)
 
-        for provider in ["aws", "gcp", "azure"]:
-            temp_workload = workload.model_copy()
-            temp_workload.provider = provider
+    async def calculate_optimized_costs_batch(self, workload: Workload, configs: List[Dict]) -> List[CostEstimate]:
+        return await self._price_all([self._optimized_request(workload, config) for config in configs])
 
-            cost = await self.fetch_current_costs(temp_workload, instance_type)
-            results[provider] = cost
-
-        return results
+    async def compare_providers(self, workload: Workload, instance_type: str = None) -> Dict[str, CostEstimate]:
+        costs = await self.fetch_costs_bulk([(workload, instance_type, provider) for provider in Provider])
+        return {provider.value: cost for provider, cost in zip(Provider, costs)}
 
     async def spot_vs_ondemand(self, workload: Workload, instance_type: str = None) -> Dict:
-        provider = workload.provider.lower()
+        provider = workload.provider
         pricing_url = self._get_pricing_url(provider)
 
         if not instance_type:
             instance_type = self._infer_instance_type(workload, provider)
 
         try:
-            spot_response = await self.client.get(f"{pricing_url}/spot-prices")
-            spot_response.raise_for_status()
-            spot_data = spot_response.json()
-
-            spot_prices = [
-                p for p in spot_data.get("prices", [])
-                if p["instance_type"] == instance_type
-            ]
+            key = ("spot", pricing_url, instance_type)
+            spot_prices = self._get_cached_pricing(key)
+            if spot_prices is None:
+                spot_response = await self._send(
+                    "GET",
+                    f"{pricing_url}/spot-prices",
+                    params={"instance_type": instance_type}
+                )
+                spot_prices = orjson.loads(spot_response.content).get("prices", [])
+                self._cache_pricing(key, spot_prices)
 
             if spot_prices:
                 spot_price = spot_prices[0]
@@ -196,140 +364,31 @@ class CostCalculator:
     def calculate_annual_savings(self, monthly_savings: float) -> float:
         return monthly_savings * 12
 
-    def _infer_instance_type(self, workload: Workload, provider: str) -> str:
-        cpu_cores = self._parse_cpu(workload.current_resources.cpu_request)
-        memory_gb = self._parse_memory(workload.current_resources.memory_request) / (1024 ** 3)
-
-        if provider == "aws":
-            if cpu_cores <= 0.5 and memory_gb <= 1:
-                return "t3.micro"
-            elif cpu_cores <= 1 and memory_gb <= 2:
-                return "t3.small"
-            elif cpu_cores <= 2 and memory_gb <= 4:
-                return "t3.medium"
-            elif cpu_cores <= 2 and memory_gb <= 8:
-                return "m5.large"
-            elif cpu_cores <= 4 and memory_gb <= 16:
-                return "m5.xlarge"
-            else:
-                return "m5.2xlarge"
-
-        elif provider == "gcp":
-            if cpu_cores <= 0.5 and memory_gb <= 1:
-                return "e2-micro"
-            elif cpu_cores <= 1 and memory_gb <= 2:
-                return "e2-small"
-            elif cpu_cores <= 2 and memory_gb <= 4:
-                return "e2-medium"
-            elif cpu_cores <= 2 and memory_gb <= 8:
-                return "n2-standard-2"
-            elif cpu_cores <= 4 and memory_gb <= 16:
-                return "n2-standard-4"
-            else:
-                return "n2-standard-8"
-
-        else:
-            if cpu_cores <= 1 and memory_gb <= 1:
-                return "B1s"
-            elif cpu_cores <= 2 and memory_gb <= 4:
-                return "B2s"
-            elif cpu_cores <= 2 and memory_gb <= 8:
-                return "Standard_D2s_v3"
-            elif cpu_cores <= 4 and memory_gb <= 16:
-                return "Standard_D4s_v3"
-            else:
-                return "Standard_D8s_v3"
-
-    def _infer_instance_type_from_config(self, config: Dict, provider: str) -> str:
-        cpu_cores = self._parse_cpu(config.get("cpu_request", "1000m"))
-        memory_gb = self._parse_memory(config.get("memory_request", "1Gi")) / (1024 ** 3)
-
-        if provider == "aws":
-            if cpu_cores <= 0.5 and memory_gb <= 1:
-                return "t3.micro"
-            elif cpu_cores <= 1 and memory_gb <= 2:
-                return "t3.small"
-            elif cpu_cores <= 2 and memory_gb <= 4:
-                return "t3.medium"
-            elif cpu_cores <= 2 and memory_gb <= 8:
-                return "m5.large"
-            elif cpu_cores <= 4 and memory_gb <= 16:
-                return "m5.xlarge"
-            else:
-                return "m5.2xlarge"
-
-        elif provider == "gcp":
-            if cpu_cores <= 0.5 and memory_gb <= 1:
-                return "e2-micro"
-            elif cpu_cores <= 1 and memory_gb <= 2:
-                return "e2-small"
-            elif cpu_cores <= 2 and memory_gb <= 4:
-                return "e2-medium"
-            elif cpu_cores <= 2 and memory_gb <= 8:
-                return "n2-standard-2"
-            elif cpu_cores <= 4 and memory_gb <= 16:
-                return "n2-standard-4"
-            else:
-                return "n2-standard-8"
-
-        else:
-            if cpu_cores <= 1 and memory_gb <= 1:
-                return "B1s"
-            elif cpu_cores <= 2 and memory_gb <= 4:
-                return "B2s"
-            elif cpu_cores <= 2 and memory_gb <= 8:
-                return "Standard_D2s_v3"
-            elif cpu_cores <= 4 and memory_gb <= 16:
-                return "Standard_D4s_v3"
-            else:
-                return "Standard_D8s_v3"
-
-    def _fallback_cost_estimate(self, workload: Workload) -> CostEstimate:
-        cpu_cores = self._parse_cpu(workload.current_resources.cpu_request)
-        memory_gb = self._parse_memory(workload.current_resources.memory_request) / (1024 ** 3)
-
-        hourly_cost = (cpu_cores * 0.04 + memory_gb * 0.005) * workload.replicas
-        monthly_cost = hourly_cost * 730
-
-        breakdown = CostBreakdown(
-            compute=monthly_cost * 0.7,
-            memory=monthly_cost * 0.2,
-            storage=monthly_cost * 0.05,
-            network=monthly_cost * 0.05,
-            total=monthly_cost
-        )
-
-        return CostEstimate(
-            hourly=hourly_cost,
-            daily=monthly_cost / 30,
-            monthly=monthly_cost,
-            yearly=monthly_cost * 12,
-            breakdown=breakdown
-        )
+    def _infer_instance_type(self, workload: Workload, provider: Provider) -> str:
+        cpu_cores = parse_cpu(workload.current_resources.cpu_request)
+        memory_gb = parse_memory(workload.current_resources.memory_request) / (1024 ** 3)
+        return pick_instance_type(provider, cpu_cores, memory_gb)
 
-    def _fallback_optimized_cost_estimate(self, workload: Workload, recommended_config: Dict) -> CostEstimate:
-        cpu_cores = self._parse_cpu(recommended_config.get("cpu_request", workload.current_resources.cpu_request))
-        memory_gb = self._parse_memory(recommended_config.get("memory_request", workload.current_resources.memory_request)) / (1024 ** 3)
-        replicas = recommended_config.get("replicas", workload.replicas)
+    def _infer_instance_type_from_config(self, config: Dict, provider: Provider) -> str:
+        cpu_cores = parse_cpu(config.get("cpu_request", "1000m"))
+        memory_gb = parse_memory(config.get("memory_request", "1Gi")) / (1024 ** 3)
+        return pick_instance_type(provider, cpu_cores, memory_gb)
 
+    def _fallback_cost_estimate(self, cpu_cores: float, memory_gb: float, replicas: int) -> CostEstimate:
         hourly_cost = (cpu_cores * 0.04 + memory_gb * 0.005) * replicas
         monthly_cost = hourly_cost * 730
-
-        breakdown = CostBreakdown(
-            compute=monthly_cost * 0.7,
-            memory=monthly_cost * 0.2,
-            storage=monthly_cost * 0.05,
-            network=monthly_cost * 0.05,
-            total=monthly_cost
-        )
+        compute, memory, storage, network = (monthly_cost * ratio for ratio in FALLBACK_BREAKDOWN_RATIOS)
 
         return CostEstimate(
             hourly=hourly_cost,
             daily=monthly_cost / 30,
             monthly=monthly_cost,
             yearly=monthly_cost * 12,
-            breakdown=breakdown
+            breakdown=CostBreakdown(
+                compute=compute,
+                memory=memory,
+                storage=storage,
+                network=network,
+                total=monthly_cost
+            )
         )
-
-    async def close(self):
-        await self.client.aclose()
@@ -1,8 +1,34 @@
 import numpy as np
-from typing import Dict, List, Tuple
-from models import Workload, WorkloadMetrics, MetricStats, ResourceSpec
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from models import Workload, WorkloadMetrics, MetricStats, ResourceSpec, Provider
+from optimizer.units import format_cpu, format_memory
 import math
 
+# (compute-optimized, memory-optimized, balanced) recommendation per provider
+INSTANCE_FAMILIES = {
+    Provider.AWS: (
+        ("c5.xlarge", "CPU-optimized instance recommended"),
+        ("r5.large", "Memory-optimized instance recommended"),
+        ("m5.large", "Balanced instance recommended"),
+    ),
+    Provider.GCP: (
+        ("c2-standard-4", "Compute-optimized instance recommended"),
+        ("n2-highmem-2", "Memory-optimized instance recommended"),
+        ("n2-standard-2", "Balanced instance recommended"),
+    ),
+    Provider.AZURE: (
+        ("Standard_F4s_v2", "Compute-optimized instance recommended"),
+        ("Standard_E4s_v3", "Memory-optimized instance recommended"),
+        ("Standard_D4s_v3", "Balanced instance recommended"),
+    ),
+}
+
+
+class MetricsAnalysis(NamedTuple):
+    cpu_variance: float
+    memory_variance: float
+    patterns: Dict
+
 
 class MLEngine:
 
@@ -12,7 +38,8 @@ class MLEngine:
     def right_size_resources(
         self,
         workload: Workload,
-        metrics: WorkloadMetrics
+        metrics: WorkloadMetrics,
+        analysis: Optional[MetricsAnalysis] = None
     ) -> Tuple[ResourceSpec, float]:
         cpu_p95 = metrics.cpu_usage.p95
         memory_p95 = metrics.memory_usage.p95
@@ -20,8 +47,8 @@ class MLEngine:
         recommended_cpu = cpu_p95 * self.safety_margin
         recommended_memory = memory_p95 * self.safety_margin
 
-        recommended_cpu_str = self._format_cpu(recommended_cpu)
-        recommended_memory_str = self._format_memory(int(recommended_memory))
+        recommended_cpu_str = format_cpu(recommended_cpu)
+        recommended_memory_str = format_memory(int(recommended_memory))
 
         limit_cpu = recommended_cpu * 1.5
         limit_memory = recommended_memory * 1.3
@@ -29,15 +56,18 @@ class MLEngine:
         new_spec = ResourceSpec(
             cpu_request=recommended_cpu_str,
             memory_request=recommended_memory_str,
-            cpu_limit=self._format_cpu(limit_cpu),
-            memory_limit=self._format_memory(int(limit_memory))
+            cpu_limit=format_cpu(limit_cpu),
+            memory_limit=format_memory(int(limit_memory))
         )
 
-        confidence = self.calculate_confidence(metrics, "right_sizing")
+        confidence = self.calculate_confidence(metrics, "right_sizing", analysis)
 
         return new_spec, confidence
 
-    def detect_patterns(self, metrics: WorkloadMetrics) -> Dict:
+    def analyze(self, metrics: WorkloadMetrics) -> MetricsAnalysis:
+        cpu_variance = self._calculate_variance(metrics.cpu_usage)
+        memory_variance = self._calculate_variance(metrics.memory_usage)
+
         patterns = {
             "has_business_hours_pattern": False,
             "has_weekend_pattern": False,
@@ -46,9 +76,6 @@ class MLEngine:
             "recommended_scaling": "none"
         }
 
-        cpu_variance = self._calculate_variance(metrics.cpu_usage)
-        memory_variance = self._calculate_variance(metrics.memory_usage)
-
         if cpu_variance > 0.4 or memory_variance > 0.3:
             patterns["has_burst_pattern"] = True
             patterns["recommended_scaling"] = "horizontal"
@@ -62,13 +89,17 @@ class MLEngine:
         if metrics.cpu_utilization_pct < 30 and metrics.memory_utilization_pct < 30:
             patterns["recommended_scaling"] = "downsize"
 
-        return patterns
+        return MetricsAnalysis(cpu_variance, memory_variance, patterns)
+
+    def detect_patterns(self, metrics: WorkloadMetrics, analysis: Optional[MetricsAnalysis] = None) -> Dict:
+        return (analysis or self.analyze(metrics)).patterns
 
     def optimize_replicas(
         self,
         workload: Workload,
         metrics: WorkloadMetrics,
-        target_utilization: float = 70.0
+        target_utilization: float = 70.0,
+        analysis: Optional[MetricsAnalysis] = None
     ) -> Tuple[int, float]:
         current_replicas = workload.replicas
         avg_cpu_util = metrics.cpu_utilization_pct
@@ -89,14 +120,19 @@ class MLEngine:
         if workload.kind == "StatefulSet" and recommended_replicas < current_replicas:
             recommended_replicas = current_replicas
 
-        confidence = self.calculate_confidence(metrics, "replica_optimization")
+        confidence = self.calculate_confidence(metrics, "replica_optimization", analysis)
 
         if abs(recommended_replicas - current_replicas) / current_replicas < 0.15:
             recommended_replicas = current_replicas
 
         return recommended_replicas, confidence
 
-    def calculate_confidence(self, metrics: WorkloadMetrics, optimization_type: str) -> float:
+    def calculate_confidence(
+        self,
+        metrics: WorkloadMetrics,
+        optimization_type: str,
+        analysis: Optional[MetricsAnalysis] = None
+    ) -> float:
         base_confidence = 0.5
 
         if metrics.sample_count > 1000:
@@ -106,8 +142,11 @@ class MLEngine:
         elif metrics.sample_count > 100:
             base_confidence += 0.1
 
-        cpu_variance = self._calculate_variance(metrics.cpu_usage)
-        memory_variance = self._calculate_variance(metrics.memory_usage)
+        if analysis is None:
+            cpu_variance = self._calculate_variance(metrics.cpu_usage)
+            memory_variance = self._calculate_variance(metrics.memory_usage)
+        else:
+            cpu_variance, memory_variance = analysis.cpu_variance, analysis.memory_variance
         avg_variance = (cpu_variance + memory_variance) / 2
 
         if avg_variance < 0.15:
@@ -127,50 +166,57 @@ class MLEngine:
         return min(1.0, base_confidence)
 
     def bin_packing(self, workloads: List[Dict], node_capacity: Dict) -> Dict:
-        sorted_workloads = sorted(
-            workloads,
-            key=lambda w: (w.get("cpu_request", 0) + w.get("memory_request", 0)),
-            reverse=True
-        )
-
-        nodes = []
-        current_node = {
-            "cpu_used": 0,
-            "memory_used": 0,
-            "cpu_capacity": node_capacity.get("cpu", 8.0),
-            "memory_capacity": node_capacity.get("memory", 32 * 1024 * 1024 * 1024),
-            "workloads": []
-        }
-
-        for workload in sorted_workloads:
-            cpu_needed = workload.get("cpu_request", 0)
-            memory_needed = workload.get("memory_request", 0)
-
-            if (current_node["cpu_used"] + cpu_needed <= current_node["cpu_capacity"] * 0.85 and
-                current_node["memory_used"] + memory_needed <= current_node["memory_capacity"] * 0.85):
-                current_node["cpu_used"] += cpu_needed
-                current_node["memory_used"] += memory_needed
-                current_node["workloads"].append(workload)
+        cpu_capacity = node_capacity.get("cpu", 8.0)
+        memory_capacity = node_capacity.get("memory", 32 * 1024 * 1024 * 1024)
+        cpu_limit = cpu_capacity * 0.85
+        memory_limit = memory_capacity * 0.85
+
+        cpu = np.fromiter((w.get("cpu_request", 0) for w in workloads), dtype=np.float64, count=len(workloads))
+        memory = np.fromiter((w.get("memory_request", 0) for w in workloads), dtype=np.float64, count=len(workloads))
+        order = np.argsort(-(cpu + memory), kind="stable")
+
+        node_ids = np.empty(len(workloads), dtype=np.intp)
+        node_cpu = np.zeros(len(workloads))
+        node_memory = np.zeros(len(workloads))
+        node_count = 0
+
+        # best fit: the open node left with the least normalised slack, else a new node
+        for i, cpu_needed, memory_needed in zip(order.tolist(), cpu[order].tolist(), memory[order].tolist()):
+            cpu_after = node_cpu[:node_count] + cpu_needed
+            memory_after = node_memory[:node_count] + memory_needed
+            fits = (cpu_after <= cpu_limit) & (memory_after <= memory_limit)
+
+            if fits.any():
+                slack = np.minimum((cpu_limit - cpu_after) / cpu_limit, (memory_limit - memory_after) / memory_limit)
+                node = int(np.argmin(np.where(fits, slack, np.inf)))
             else:
-                nodes.append(current_node)
-                current_node = {
-                    "cpu_used": cpu_needed,
-                    "memory_used": memory_needed,
-                    "cpu_capacity": node_capacity.get("cpu", 8.0),
-                    "memory_capacity": node_capacity.get("memory", 32 * 1024 * 1024 * 1024),
-                    "workloads": [workload]
-                }
-
-        if current_node["workloads"]:
-            nodes.append(current_node)
+                node = node_count
+                node_count += 1
+
+            node_cpu[node] += cpu_needed
+            node_memory[node] += memory_needed
+            node_ids[i] = node
+
+        nodes = [
+            {
+                "cpu_used": float(node_cpu[n]),
+                "memory_used": float(node_memory[n]),
+                "cpu_capacity": cpu_capacity,
+                "memory_capacity": memory_capacity,
+                "workloads": []
+            }
+            for n in range(node_count)
+        ]
+        for i in order.tolist():
+            nodes[node_ids[i]]["workloads"].append(workloads[i])
 
-        total_cpu_utilization = sum(n["cpu_used"] for n in nodes) / sum(n["cpu_capacity"] for n in nodes) if nodes else 0
-        total_memory_utilization = sum(n["memory_used"] for n in nodes) / sum(n["memory_capacity"] for n in nodes) if nodes else 0
+        total_cpu_utilization = cpu.sum() / (len(nodes) * cpu_capacity) if nodes else 0
+        total_memory_utilization = memory.sum() / (len(nodes) * memory_capacity) if nodes else 0
 
         return {
             "required_nodes": len(nodes),
-            "total_cpu_utilization": total_cpu_utilization * 100,
-            "total_memory_utilization": total_memory_utilization * 100,
+            "total_cpu_utilization": float(total_cpu_utilization * 100),
+            "total_memory_utilization": float(total_memory_utilization * 100),
             "nodes": nodes,
             "savings_potential": max(0, len(workloads) - len(nodes))
         }
@@ -180,7 +226,12 @@ class MLEngine:
             return True
         return False
 
-    def recommend_spot_instances(self, workload: Workload, metrics: WorkloadMetrics) -> Tuple[bool, float, str]:
+    def recommend_spot_instances(
+        self,
+        workload: Workload,
+        metrics: WorkloadMetrics,
+        analysis: Optional[MetricsAnalysis] = None
+    ) -> Tuple[bool, float, str]:
         is_suitable = True
         confidence = 0.7
         reason = ""
@@ -190,7 +241,7 @@ class MLEngine:
             reason = "StatefulSets and DaemonSets are not suitable for spot instances"
             return is_suitable, 0.0, reason
 
-        patterns = self.detect_patterns(metrics)
+        patterns = self.detect_patterns(metrics, analysis)
         if patterns["has_burst_pattern"]:
             confidence -= 0.2
             reason = "Burst pattern detected, spot interruptions may impact performance"
@@ -214,34 +265,23 @@ class MLEngine:
         self,
         current_cpu: float,
         current_memory: float,
-        provider: str
+        provider: Provider
     ) -> Tuple[str, str]:
-        if provider.lower() == "aws":
-            if current_cpu / current_memory > 0.5:
-                return "c5.xlarge", "CPU-optimized instance recommended"
-            elif current_memory / current_cpu > 4:
-                return "r5.large", "Memory-optimized instance recommended"
-            else:
-                return "m5.large", "Balanced instance recommended"
-
-        elif provider.lower() == "gcp":
-            if current_cpu / current_memory > 0.5:
-                return "c2-standard-4", "Compute-optimized instance recommended"
-            elif current_memory / current_cpu > 4:
-                return "n2-highmem-2", "Memory-optimized instance recommended"
-            else:
-                return "n2-standard-2", "Balanced instance recommended"
+        compute, memory, balanced = INSTANCE_FAMILIES[provider]
 
+        if current_cpu / current_memory > 0.5:
+            return compute
+        elif current_memory / current_cpu > 4:
+            return memory
         else:
-            if current_cpu / current_memory > 0.5:
-                return "Standard_F4s_v2", "Compute-optimized instance recommended"
-            elif current_memory / current_cpu > 4:
-                return "Standard_E4s_v3", "Memory-optimized instance recommended"
-            else:
-                return "Standard_D4s_v3", "Balanced instance recommended"
+            return balanced
 
-    def detect_scheduled_scaling_opportunity(self, metrics: WorkloadMetrics) -> Dict:
-        patterns = self.detect_patterns(metrics)
+    def detect_scheduled_scaling_opportunity(
+        self,
+        metrics: WorkloadMetrics,
+        analysis: Optional[MetricsAnalysis] = None
+    ) -> Dict:
+        patterns = self.detect_patterns(metrics, analysis)
 
         if patterns["has_business_hours_pattern"]:
             return {
@@ -272,32 +312,3 @@ class MLEngine:
 
         variance = (stats.p95 - stats.p50) / stats.avg if stats.avg > 0 else 0
         return abs(variance)
-
-    def _format_cpu(self, cpu_cores: float) -> str:
-        if cpu_cores < 1:
-            return f"{int(cpu_cores * 1000)}m"
-        return f"{cpu_cores:.1f}"
-
-    def _format_memory(self, memory_bytes: int) -> str:
-        if memory_bytes < 1024 * 1024:
-            return f"{memory_bytes // 1024}Ki"
-        elif memory_bytes < 1024 * 1024 * 1024:
-            return f"{memory_bytes // (1024 * 1024)}Mi"
-        else:
-            return f"{memory_bytes // (1024 * 1024 * 1024)}Gi"
-
-    def _parse_cpu(self, cpu_string: str) -> float:
-        if cpu_string.endswith('m'):
-            return float(cpu_string[:-1]) / 1000
-        return float(cpu_string)
-
-    def _parse_memory(self, memory_string: str) -> int:
-        multipliers = {
-            'Ki': 1024,
-            'Mi': 1024 * 1024,
-            'Gi': 1024 * 1024 * 1024
-        }
-        for suffix, multiplier in multipliers.items():
-            if memory_string.endswith(suffix):
-                return int(float(memory_string[:-len(suffix)]) * multiplier)
-        return int(memory_string)
@@ -1,5 +1,14 @@
+import os
+import asyncio
+import heapq
+import itertools
+import threading
+import time
 import uuid
-from typing import List, Dict
+from collections import OrderedDict
+from functools import lru_cache, partial
+from operator import attrgetter
+from typing import List, Dict, NamedTuple, Optional, Tuple
 from models import (
     Workload, WorkloadMetrics, OptimizationRecommendation, OptimizationType,
     RiskAssessment, RiskLevel, RollbackPlan, ResourceSpec
@@ -7,132 +16,367 @@ from models import (
 from optimizer.ml_engine import MLEngine
 from optimizer.cost_calculator import CostCalculator
 
+ML_CACHE_TTL = float(os.getenv("ML_CACHE_TTL", "300"))
+ML_CACHE_MAX_ENTRIES = 10000
+UNUSED_RESOURCE_CONFIDENCE = 0.6
+BY_MONTHLY_SAVINGS = attrgetter("monthly_savings")
+
+# fixed risk and rollback for spot and unused-resource recommendations, shared by every one built
+SPOT_RISK = RiskAssessment(
+    level=RiskLevel.MEDIUM,
+    score=0.5,
+    factors=("Potential spot instance interruptions", "Requires fault-tolerant application design"),
+    mitigation_steps=("Ensure replicas > 1", "Implement graceful shutdown", "Use spot instance pools")
+)
+SPOT_ROLLBACK = RollbackPlan(
+    steps=("Scale back to on-demand instances", "Verify application stability"),
+    estimated_time_minutes=5,
+    automation_available=True
+)
+UNUSED_RESOURCE_RISK = RiskAssessment(
+    level=RiskLevel.LOW,
+    score=0.2,
+    factors=("Very low resource utilization detected", "Workload may be unused"),
+    mitigation_steps=("Verify workload purpose", "Check application logs", "Coordinate with team")
+)
+UNUSED_RESOURCE_ROLLBACK = RollbackPlan(
+    steps=("Restore from backup", "Redeploy from manifest"),
+    estimated_time_minutes=10,
+    automation_available=True
+)
+
+# one constructor per builder with the fields that never vary for that optimization pre-bound
+_RIGHT_SIZING_RECOMMENDATION = partial(
+    OptimizationRecommendation.model_construct,
+    optimization_type=OptimizationType.RIGHT_SIZE_CPU,
+    implementation_complexity="low",
+    estimated_implementation_time="5-10 minutes"
+)
+_REPLICA_RECOMMENDATION = partial(
+    OptimizationRecommendation.model_construct,
+    implementation_complexity="low",
+    estimated_implementation_time="2-5 minutes"
+)
+_SPOT_RECOMMENDATION = partial(
+    OptimizationRecommendation.model_construct,
+    optimization_type=OptimizationType.SPOT_INSTANCES,
+    risk_assessment=SPOT_RISK,
+    rollback_plan=SPOT_ROLLBACK,
+    implementation_complexity="medium",
+    estimated_implementation_time="15-30 minutes"
+)
+_SCHEDULED_SCALING_RECOMMENDATION = partial(
+    OptimizationRecommendation.model_construct,
+    optimization_type=OptimizationType.SCHEDULED_SCALING,
+    implementation_complexity="medium",
+    estimated_implementation_time="20-40 minutes"
+)
+_UNUSED_RESOURCE_RECOMMENDATION = partial(
+    OptimizationRecommendation.model_construct,
+    optimization_type=OptimizationType.REMOVE_UNUSED,
+    savings_percentage=100.0,
+    confidence_score=UNUSED_RESOURCE_CONFIDENCE,
+    risk_assessment=UNUSED_RESOURCE_RISK,
+    rollback_plan=UNUSED_RESOURCE_ROLLBACK,
+    implementation_complexity="low",
+    estimated_implementation_time="5 minutes"
+)
+
+_DATA_STORE_TAGS = frozenset({"database", "db"})
+_CRITICAL_PATH_TAGS = frozenset({"api", "gateway"})
+# optimizations whose risk rises with CPU pressure
+_CPU_SENSITIVE_TYPES = frozenset({OptimizationType.REDUCE_REPLICAS, OptimizationType.RIGHT_SIZE_CPU})
+_RIGHT_SIZE_TYPES = frozenset({OptimizationType.RIGHT_SIZE_CPU, OptimizationType.RIGHT_SIZE_MEMORY})
+_REPLICA_TYPES = frozenset({OptimizationType.REDUCE_REPLICAS, OptimizationType.INCREASE_REPLICAS})
+
+# recommendation ids share one random UUID prefix per process; the last 48-bit group is a counter
+_ID_PREFIX = str(uuid.uuid4())[:24]
+_id_counter = itertools.count()
+
+
+def _next_recommendation_id() -> str:
+    return f"{_ID_PREFIX}{next(_id_counter):012x}"
+
+
+class WorkloadPredictions(NamedTuple):
+    right_sizing: Tuple[ResourceSpec, float]
+    replicas: Optional[Tuple[int, float]]
+    unused: bool
+    spot: Tuple[bool, float, str]
+    scheduled_scaling: Dict
+
+
+@lru_cache(maxsize=4096)
+def _assess_risk(
+    kind: str,
+    single_replica: bool,
+    optimization_type: OptimizationType,
+    high_cpu: bool
+) -> Tuple[RiskLevel, float, Tuple[str, ...], Tuple[str, ...]]:
+    risk_score = 0.3
+    factors = []
+    mitigation_steps = []
+
+    if kind == "StatefulSet":
+        risk_score += 0.2
+        factors.append("StatefulSet requires careful handling")
+        mitigation_steps.append("Test in staging environment first")
+
+    if single_replica:
+        risk_score += 0.15
+        factors.append("Single replica - no redundancy")
+        mitigation_steps.append("Consider increasing replicas before optimization")
+
+    if high_cpu:
+        risk_score += 0.2
+        factors.append("High CPU utilization")
+        mitigation_steps.append("Monitor performance closely after change")
+
+    if optimization_type == OptimizationType.SPOT_INSTANCES:
+        risk_score = 0.5
+        factors.append("Spot instances can be interrupted")
+        mitigation_steps.extend([
+            "Ensure application handles interruptions gracefully",
+            "Maintain on-demand fallback capacity"
+        ])
+
+    if risk_score >= 0.7:
+        level = RiskLevel.HIGH
+    elif risk_score >= 0.5:
+        level = RiskLevel.MEDIUM
+    else:
+        level = RiskLevel.LOW
+
+    return (
+        level,
+        min(1.0, risk_score),
+        tuple(factors) if factors else ("Standard optimization",),
+        tuple(mitigation_steps) if mitigation_steps else ("Follow standard deployment procedures",)
+    )
+
+
+@lru_cache(maxsize=4096)
+def _rollback_steps(
+    optimization_type: OptimizationType,
+    replicas: int,
+    cpu_request: str,
+    memory_request: str
+) -> Tuple[Tuple[str, ...], int]:
+    if optimization_type in _RIGHT_SIZE_TYPES:
+        return (
+            f"Restore original resource requests: {cpu_request} CPU, {memory_request} memory",
+            "Apply updated manifest",
+            "Verify pod stability"
+        ), 5
+
+    elif optimization_type in _REPLICA_TYPES:
+        return (
+            f"Scale back to {replicas} replicas",
+            "Verify all pods are running"
+        ), 2
+
+    elif optimization_type == OptimizationType.SPOT_INSTANCES:
+        return (
+            "Switch back to on-demand instances",
+            "Verify application availability",
+            "Monitor for stability"
+        ), 10
+
+    elif optimization_type == OptimizationType.SCHEDULED_SCALING:
+        return (
+            "Remove HorizontalPodAutoscaler or CronJob",
+            f"Set replicas to constant {replicas}"
+        ), 5
+
+    return ("Revert to previous configuration", "Verify workload health"), 5
+
 
 class Recommender:
 
     def __init__(self, ml_engine: MLEngine, cost_calculator: CostCalculator):
         self.ml_engine = ml_engine
         self.cost_calculator = cost_calculator
+        self._ml_cache: OrderedDict = OrderedDict()
+        self._ml_cache_lock = threading.Lock()
 
     async def generate_recommendations(
         self,
         workload: Workload,
         metrics: WorkloadMetrics,
-        min_confidence: float = 0.5
+        min_confidence: float = 0.5,
+        min_savings: float = 0.0,
+        allow_high_risk: bool = True,
+        top_k: Optional[int] = None
     ) -> List[OptimizationRecommendation]:
-        recommendations = []
-
-        current_cost = await self.cost_calculator.fetch_current_costs(workload)
-
-        if self.ml_engine.detect_unused_resources(metrics, threshold_pct=5.0):
-            rec = await self._create_unused_resource_recommendation(workload, metrics, current_cost)
-            if rec and rec.confidence_score >= min_confidence:
-                recommendations.append(rec)
-
-        right_size_rec = await self._create_right_sizing_recommendation(workload, metrics, current_cost)
-        if right_size_rec and right_size_rec.confidence_score >= min_confidence:
-            recommendations.append(right_size_rec)
-
-        replica_rec = await self._create_replica_optimization_recommendation(workload, metrics, current_cost)
-        if replica_rec and replica_rec.confidence_score >= min_confidence:
-            recommendations.append(replica_rec)
+        # the ML predictors are CPU-bound, so score in a worker thread to keep the event loop free
+        predictions = await asyncio.to_thread(self._predict, workload, metrics)
+        current_resources = workload.current_resources.model_dump()
+
+        # confidence is known before any builder runs, so weak candidates are never priced or rendered
+        # builders whose optimized cost comes from one batched pricing call: (builder, recommended_config, confidence)
+        candidates = []
+
+        new_resources, right_size_confidence = predictions.right_sizing
+        if new_resources != workload.current_resources and right_size_confidence >= min_confidence:
+            candidates.append((self._create_right_sizing_recommendation, {
+                "cpu_request": new_resources.cpu_request,
+                "memory_request": new_resources.memory_request,
+                "cpu_limit": new_resources.cpu_limit,
+                "memory_limit": new_resources.memory_limit,
+                "replicas": workload.replicas
+            }, right_size_confidence))
+
+        if predictions.replicas is not None:
+            recommended_replicas, replica_confidence = predictions.replicas
+            if recommended_replicas != workload.replicas and replica_confidence >= min_confidence:
+                candidates.append((self._create_replica_optimization_recommendation, {
+                    **current_resources,
+                    "replicas": recommended_replicas
+                }, replica_confidence))
+
+        # the current cost is priced in the same batch as the candidates, alongside the spot price lookup
+        configs = [{**current_resources, "replicas": workload.replicas}] + [config for _, config, _ in candidates]
+        pricing = self.cost_calculator.calculate_optimized_costs_batch(workload, configs)
+
+        spot_suitable, spot_confidence, _ = predictions.spot
+        if spot_suitable and spot_confidence >= min_confidence:
+            costs, spot_data = await asyncio.gather(pricing, self.cost_calculator.spot_vs_ondemand(workload))
+        else:
+            costs = await pricing
+            spot_data = None
+        current_cost, *optimized_costs = costs
+
+        priced = [
+            build(workload, metrics, current_cost, current_resources, config, optimized_cost, confidence, min_savings, allow_high_risk)
+            for (build, config, confidence), optimized_cost in zip(candidates, optimized_costs)
+        ]
+
+        built = []
+        if predictions.unused and UNUSED_RESOURCE_CONFIDENCE >= min_confidence:
+            built.append(self._create_unused_resource_recommendation(workload, metrics, current_cost, current_resources, min_savings, allow_high_risk))
+        if spot_data is not None:
+            built.append(self._create_spot_instance_recommendation(workload, metrics, current_cost, current_resources, predictions.spot, spot_data, min_savings, allow_high_risk))
+        if predictions.scheduled_scaling.get("confidence", 0.7) >= min_confidence:
+            built.append(self._create_scheduled_scaling_recommendation(workload, metrics, current_cost, current_resources, predictions.scheduled_scaling, min_savings, allow_high_risk))
+
+        recommendations = [rec for rec in priced + built if rec]
+        if top_k is not None:
+            return heapq.nlargest(top_k, recommendations, key=BY_MONTHLY_SAVINGS)
+        recommendations.sort(key=BY_MONTHLY_SAVINGS, reverse=True)
 
-        spot_rec = await self._create_spot_instance_recommendation(workload, metrics, current_cost)
-        if spot_rec and spot_rec.confidence_score >= min_confidence:
-            recommendations.append(spot_rec)
+        return recommendations
 
-        scaling_rec = await self._create_scheduled_scaling_recommendation(workload, metrics, current_cost)
-        if scaling_rec and scaling_rec.confidence_score >= min_confidence:
-            recommendations.append(scaling_rec)
+    def _predict(self, workload: Workload, metrics: WorkloadMetrics) -> WorkloadPredictions:
+        key = (
+            workload.id,
+            workload.kind,
+            workload.replicas,
+            workload.current_resources,
+            metrics.cpu_usage,
+            metrics.memory_usage,
+            metrics.cpu_utilization_pct,
+            metrics.memory_utilization_pct,
+            metrics.sample_count,
+            metrics.time_range_hours
+        )
+        with self._ml_cache_lock:
+            cached = self._ml_cache.get(key)
+            if cached and time.monotonic() - cached[0] < ML_CACHE_TTL:
+                self._ml_cache.move_to_end(key)
+                return cached[1]
+
+        analysis = self.ml_engine.analyze(metrics)
+        replicas = None
+
+        # a single replica can only be scaled up, which never saves money
+        if workload.replicas > 1:
+            replicas = self.ml_engine.optimize_replicas(workload, metrics, analysis=analysis)
+
+        predictions = WorkloadPredictions(
+            right_sizing=self.ml_engine.right_size_resources(workload, metrics, analysis),
+            replicas=replicas,
+            unused=self.ml_engine.detect_unused_resources(metrics, threshold_pct=5.0),
+            spot=self.ml_engine.recommend_spot_instances(workload, metrics, analysis),
+            scheduled_scaling=self.ml_engine.detect_scheduled_scaling_opportunity(metrics, analysis)
+        )
 
-        recommendations.sort(key=lambda r: r.monthly_savings, reverse=True)
+        with self._ml_cache_lock:
+            self._ml_cache[key] = (time.monotonic(), predictions)
+            self._ml_cache.move_to_end(key)
+            if len(self._ml_cache) > ML_CACHE_MAX_ENTRIES:
+                self._ml_cache.popitem(last=False)
 
-        return recommendations
+        return predictions
 
-    async def _create_right_sizing_recommendation(
+    def _create_right_sizing_recommendation(
         self,
         workload: Workload,
         metrics: WorkloadMetrics,
-        current_cost
+        current_cost,
+        current_resources: Dict,
+        recommended_config: Dict,
+        optimized_cost,
+        confidence: float,
+        min_savings: float = 0.0,
+        allow_high_risk: bool = True
     ) -> OptimizationRecommendation:
-        new_resources, confidence = self.ml_engine.right_size_resources(workload, metrics)
-
-        if new_resources == workload.current_resources:
-            return None
-
-        recommended_config = {
-            "cpu_request": new_resources.cpu_request,
-            "memory_request": new_resources.memory_request,
-            "cpu_limit": new_resources.cpu_limit,
-            "memory_limit": new_resources.memory_limit,
-            "replicas": workload.replicas
-        }
-
-        optimized_cost = await self.cost_calculator.calculate_optimized_costs(
-            workload, recommended_config
-        )
-
         savings = current_cost.monthly - optimized_cost.monthly
-        if savings <= 0:
+        if savings <= 0 or savings < min_savings:
             return None
 
         risk = self.assess_risk(workload, OptimizationType.RIGHT_SIZE_CPU, metrics)
+        if risk.level == RiskLevel.HIGH and not allow_high_risk:
+            return None
+
         rollback = self.create_rollback_plan(workload, OptimizationType.RIGHT_SIZE_CPU)
 
-        return OptimizationRecommendation(
-            id=str(uuid.uuid4()),
+        return _RIGHT_SIZING_RECOMMENDATION(
+            id=_next_recommendation_id(),
             workload_id=workload.id,
             workload_name=workload.name,
             cluster_name=workload.cluster_name,
             namespace=workload.namespace,
-            optimization_type=OptimizationType.RIGHT_SIZE_CPU,
             title=f"Right-size resources for {workload.name}",
             description=f"Reduce resource requests based on P95 utilization (CPU: {metrics.cpu_utilization_pct:.1f}%, Memory: {metrics.memory_utilization_pct:.1f}%)",
-            current_config=workload.current_resources.dict(),
+            current_config={**current_resources},
             recommended_config=recommended_config,
             current_cost=current_cost,
             optimized_cost=optimized_cost,
             monthly_savings=savings,
             yearly_savings=savings * 12,
-            savings_percentage=(savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0,
+            savings_percentage=(savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0.0,
             confidence_score=confidence,
             risk_assessment=risk,
             rollback_plan=rollback,
-            dependencies=[],
-            implementation_complexity="low",
-            estimated_implementation_time="5-10 minutes"
+            dependencies=[]
         )
 
-    async def _create_replica_optimization_recommendation(
+    def _create_replica_optimization_recommendation(
         self,
         workload: Workload,
         metrics: WorkloadMetrics,
-        current_cost
+        current_cost,
+        current_resources: Dict,
+        recommended_config: Dict,
+        optimized_cost,
+        confidence: float,
+        min_savings: float = 0.0,
+        allow_high_risk: bool = True
     ) -> OptimizationRecommendation:
-        recommended_replicas, confidence = self.ml_engine.optimize_replicas(workload, metrics)
-
-        if recommended_replicas == workload.replicas:
-            return None
-
-        recommended_config = {
-            **workload.current_resources.dict(),
-            "replicas": recommended_replicas
-        }
-
-        optimized_cost = await self.cost_calculator.calculate_optimized_costs(
-            workload, recommended_config
-        )
-
         savings = current_cost.monthly - optimized_cost.monthly
-        if savings <= 0:
+        if savings <= 0 or savings < min_savings:
             return None
 
+        recommended_replicas = recommended_config["replicas"]
         opt_type = OptimizationType.REDUCE_REPLICAS if recommended_replicas < workload.replicas else OptimizationType.INCREASE_REPLICAS
         risk = self.assess_risk(workload, opt_type, metrics)
+        if risk.level == RiskLevel.HIGH and not allow_high_risk:
+            return None
+
         rollback = self.create_rollback_plan(workload, opt_type)
 
-        return OptimizationRecommendation(
-            id=str(uuid.uuid4()),
+        return _REPLICA_RECOMMENDATION(
+            id=_next_recommendation_id(),
             workload_id=workload.id,
             workload_name=workload.name,
             cluster_name=workload.cluster_name,
@@ -140,123 +384,105 @@ class Recommender:
             optimization_type=opt_type,
             title=f"Optimize replica count for {workload.name}",
             description=f"Adjust replicas from {workload.replicas} to {recommended_replicas} based on utilization patterns",
-            current_config={"replicas": workload.replicas, **workload.current_resources.dict()},
+            current_config={"replicas": workload.replicas, **current_resources},
             recommended_config=recommended_config,
             current_cost=current_cost,
             optimized_cost=optimized_cost,
             monthly_savings=savings,
             yearly_savings=savings * 12,
-            savings_percentage=(savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0,
+            savings_percentage=(savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0.0,
             confidence_score=confidence,
             risk_assessment=risk,
             rollback_plan=rollback,
-            dependencies=[],
-            implementation_complexity="low",
-            estimated_implementation_time="2-5 minutes"
+            dependencies=[]
         )
 
-    async def _create_spot_instance_recommendation(
+    def _create_spot_instance_recommendation(
         self,
         workload: Workload,
         metrics: WorkloadMetrics,
-        current_cost
+        current_cost,
+        current_resources: Dict,
+        spot_suitability: Tuple[bool, float, str],
+        spot_data: Dict,
+        min_savings: float = 0.0,
+        allow_high_risk: bool = True
     ) -> OptimizationRecommendation:
-        is_suitable, confidence, reason = self.ml_engine.recommend_spot_instances(workload, metrics)
-
-        if not is_suitable:
-            return None
-
-        spot_data = await self.cost_calculator.spot_vs_ondemand(workload)
+        _, confidence, reason = spot_suitability
         savings = spot_data.get("monthly_savings", 0)
 
-        if savings <= 0:
+        if savings <= 0 or savings < min_savings:
             return None
 
         recommended_config = {
-            **workload.current_resources.dict(),
+            **current_resources,
             "instance_type": "spot",
             "replicas": workload.replicas
         }
 
-        optimized_cost = current_cost.model_copy()
-        optimized_cost.monthly = spot_data.get("spot_monthly", current_cost.monthly)
-        optimized_cost.yearly = optimized_cost.monthly * 12
+        spot_monthly = spot_data.get("spot_monthly", current_cost.monthly)
+        optimized_cost = current_cost.model_copy(update={"monthly": spot_monthly, "yearly": spot_monthly * 12})
 
-        risk = RiskAssessment(
-            level=RiskLevel.MEDIUM,
-            score=0.5,
-            factors=["Potential spot instance interruptions", "Requires fault-tolerant application design"],
-            mitigation_steps=["Ensure replicas > 1", "Implement graceful shutdown", "Use spot instance pools"]
-        )
-
-        rollback = RollbackPlan(
-            steps=["Scale back to on-demand instances", "Verify application stability"],
-            estimated_time_minutes=5,
-            automation_available=True
-        )
-
-        return OptimizationRecommendation(
-            id=str(uuid.uuid4()),
+        return _SPOT_RECOMMENDATION(
+            id=_next_recommendation_id(),
             workload_id=workload.id,
             workload_name=workload.name,
             cluster_name=workload.cluster_name,
             namespace=workload.namespace,
-            optimization_type=OptimizationType.SPOT_INSTANCES,
             title=f"Use spot instances for {workload.name}",
             description=f"Switch to spot instances for {spot_data.get('discount_percentage', 0):.0f}% savings. {reason}",
-            current_config={"instance_type": "on-demand", **workload.current_resources.dict()},
+            current_config={"instance_type": "on-demand", **current_resources},
             recommended_config=recommended_config,
             current_cost=current_cost,
             optimized_cost=optimized_cost,
             monthly_savings=savings,
             yearly_savings=savings * 12,
-            savings_percentage=(savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0,
+            savings_percentage=(savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0.0,
             confidence_score=confidence,
-            risk_assessment=risk,
-            rollback_plan=rollback,
-            dependencies=[],
-            implementation_complexity="medium",
-            estimated_implementation_time="15-30 minutes"
+            dependencies=[]
         )
 
-    async def _create_scheduled_scaling_recommendation(
+    def _create_scheduled_scaling_recommendation(
         self,
         workload: Workload,
         metrics: WorkloadMetrics,
-        current_cost
+        current_cost,
+        current_resources: Dict,
+        scaling_opportunity: Dict,
+        min_savings: float = 0.0,
+        allow_high_risk: bool = True
     ) -> OptimizationRecommendation:
-        scaling_opportunity = self.ml_engine.detect_scheduled_scaling_opportunity(metrics)
-
         if not scaling_opportunity.get("suitable", False):
             return None
 
         scale_down_factor = scaling_opportunity.get("off_peak_scale_down", 0.5)
         estimated_savings = current_cost.monthly * (1 - scale_down_factor) * 0.5
 
-        if estimated_savings <= 0:
+        if estimated_savings <= 0 or estimated_savings < min_savings:
             return None
 
+        risk = self.assess_risk(workload, OptimizationType.SCHEDULED_SCALING, metrics)
+        if risk.level == RiskLevel.HIGH and not allow_high_risk:
+            return None
+
+        rollback = self.create_rollback_plan(workload, OptimizationType.SCHEDULED_SCALING)
+
         recommended_config = {
-            **workload.current_resources.dict(),
+            **current_resources,
             "scaling_schedule": scaling_opportunity.get("strategy"),
             "peak_replicas": workload.replicas,
             "off_peak_replicas": max(1, int(workload.replicas * scale_down_factor))
         }
 
-        optimized_cost = current_cost.model_copy()
-        optimized_cost.monthly = current_cost.monthly - estimated_savings
-        optimized_cost.yearly = optimized_cost.monthly * 12
+        optimized_monthly = current_cost.monthly - estimated_savings
+        optimized_cost = current_cost.model_copy(update={"monthly": optimized_monthly, "yearly": optimized_monthly * 12})
 
-        risk = self.assess_risk(workload, OptimizationType.SCHEDULED_SCALING, metrics)
-        rollback = self.create_rollback_plan(workload, OptimizationType.SCHEDULED_SCALING)
-
-        return OptimizationRecommendation(
-            id=str(uuid.uuid4()),
+        return _SCHEDULED_SCALING_RECOMMENDATION(
+            id=_next_recommendation_id(),
             workload_id=workload.id,
             workload_name=workload.name,
             cluster_name=workload.cluster_name,
             namespace=workload.namespace,
-            optimization_type=OptimizationType.SCHEDULED_SCALING,
             title=f"Implement scheduled scaling for {workload.name}",
             description=f"Scale down during off-peak hours ({scaling_opportunity.get('peak_hours', 'identified periods')})",
             current_config={"replicas": workload.replicas, "scaling": "none"},
@@ -265,56 +491,40 @@ class Recommender:
             optimized_cost=optimized_cost,
             monthly_savings=estimated_savings,
             yearly_savings=estimated_savings * 12,
-            savings_percentage=(estimated_savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0,
+            savings_percentage=(estimated_savings / current_cost.monthly * 100) if current_cost.monthly > 0 else 0.0,
             confidence_score=scaling_opportunity.get("confidence", 0.7),
             risk_assessment=risk,
             rollback_plan=rollback,
-            dependencies=[],
-            implementation_complexity="medium",
-            estimated_implementation_time="20-40 minutes"
+            dependencies=[]
         )
 
-    async def _create_unused_resource_recommendation(
+    def _create_unused_resource_recommendation(
         self,
         workload: Workload,
         metrics: WorkloadMetrics,
-        current_cost
+        current_cost,
+        current_resources: Dict,
+        min_savings: float = 0.0,
+        allow_high_risk: bool = True
     ) -> OptimizationRecommendation:
-        risk = RiskAssessment(
-            level=RiskLevel.LOW,
-            score=0.2,
-            factors=["Very low resource utilization detected", "Workload may be unused"],
-            mitigation_steps=["Verify workload purpose", "Check application logs", "Coordinate with team"]
-        )
-
-        rollback = RollbackPlan(
-            steps=["Restore from backup", "Redeploy from manifest"],
-            estimated_time_minutes=10,
-            automation_available=True
-        )
+        if current_cost.monthly < min_savings:
+            return None
 
-        return OptimizationRecommendation(
-            id=str(uuid.uuid4()),
+        return _UNUSED_RESOURCE_RECOMMENDATION(
+            id=_next_recommendation_id(),
             workload_id=workload.id,
             workload_name=workload.name,
             cluster_name=workload.cluster_name,
             namespace=workload.namespace,
-            optimization_type=OptimizationType.REMOVE_UNUSED,
             title=f"Remove unused workload {workload.name}",
             description=f"Workload has very low utilization (CPU: {metrics.cpu_utilization_pct:.1f}%, Memory: {metrics.memory_utilization_pct:.1f}%) and may be unused",
-            current_config=workload.current_resources.dict(),
+            current_config={**current_resources},
             recommended_config={"action": "delete"},
             current_cost=current_cost,
             optimized_cost=current_cost.model_copy(update={"monthly": 0, "yearly": 0}),
             monthly_savings=current_cost.monthly,
             yearly_savings=current_cost.yearly,
-            savings_percentage=100.0,
-            confidence_score=0.6,
-            risk_assessment=risk,
-            rollback_plan=rollback,
-            dependencies=[],
-            implementation_complexity="low",
-            estimated_implementation_time="5 minutes"
+            dependencies=[]
         )
 
     def assess_risk(
@@ -323,46 +533,17 @@ class Recommender:
         optimization_type: OptimizationType,
         metrics: WorkloadMetrics = None
     ) -> RiskAssessment:
-        risk_score = 0.3
-        factors = []
-        mitigation_steps = []
-
-        if workload.kind == "StatefulSet":
-            risk_score += 0.2
-            factors.append("StatefulSet requires careful handling")
-            mitigation_steps.append("Test in staging environment first")
-
-        if workload.replicas == 1:
-            risk_score += 0.15
-            factors.append("Single replica - no redundancy")
-            mitigation_steps.append("Consider increasing replicas before optimization")
-
-        if optimization_type in [OptimizationType.REDUCE_REPLICAS, OptimizationType.RIGHT_SIZE_CPU]:
-            if metrics and metrics.cpu_utilization_pct > 80:
-                risk_score += 0.2
-                factors.append("High CPU utilization")
-                mitigation_steps.append("Monitor performance closely after change")
-
-        if optimization_type == OptimizationType.SPOT_INSTANCES:
-            risk_score = 0.5
-            factors.append("Spot instances can be interrupted")
-            mitigation_steps.extend([
-                "Ensure application handles interruptions gracefully",
-                "Maintain on-demand fallback capacity"
-            ])
-
-        if risk_score >= 0.7:
-            level = RiskLevel.HIGH
-        elif risk_score >= 0.5:
-            level = RiskLevel.MEDIUM
-        else:
-            level = RiskLevel.LOW
-
-        return RiskAssessment(
+        level, score, factors, mitigation_steps = _assess_risk(
+            workload.kind,
+            workload.replicas == 1,
+            optimization_type,
+            optimization_type in _CPU_SENSITIVE_TYPES and bool(metrics and metrics.cpu_utilization_pct > 80)
+        )
+        return RiskAssessment.model_construct(
             level=level,
-            score=min(1.0, risk_score),
-            factors=factors if factors else ["Standard optimization"],
-            mitigation_steps=mitigation_steps if mitigation_steps else ["Follow standard deployment procedures"]
+            score=score,
+            factors=factors,
+            mitigation_steps=mitigation_steps
         )
 
     def create_rollback_plan(
@@ -370,44 +551,13 @@ class Recommender:
         workload: Workload,
         optimization_type: OptimizationType
     ) -> RollbackPlan:
-        steps = []
-        estimated_time = 5
-
-        if optimization_type in [OptimizationType.RIGHT_SIZE_CPU, OptimizationType.RIGHT_SIZE_MEMORY]:
-            steps = [
-                f"Restore original resource requests: {workload.current_resources.cpu_request} CPU, {workload.current_resources.memory_request} memory",
-                "Apply updated manifest",
-                "Verify pod stability"
-            ]
-            estimated_time = 5
-
-        elif optimization_type in [OptimizationType.REDUCE_REPLICAS, OptimizationType.INCREASE_REPLICAS]:
-            steps = [
-                f"Scale back to {workload.replicas} replicas",
-                "Verify all pods are running"
-            ]
-            estimated_time = 2
-
-        elif optimization_type == OptimizationType.SPOT_INSTANCES:
-            steps = [
-                "Switch back to on-demand instances",
-                "Verify application availability",
-                "Monitor for stability"
-            ]
-            estimated_time = 10
-
-        elif optimization_type == OptimizationType.SCHEDULED_SCALING:
-            steps = [
-                "Remove HorizontalPodAutoscaler or CronJob",
-                f"Set replicas to constant {workload.replicas}"
-            ]
-            estimated_time = 5
-
-        else:
-            steps = ["Revert to previous configuration", "Verify workload health"]
-            estimated_time = 5
-
-        return RollbackPlan(
+        steps, estimated_time = _rollback_steps(
+            optimization_type,
+            workload.replicas,
+            workload.current_resources.cpu_request,
+            workload.current_resources.memory_request
+        )
+        return RollbackPlan.model_construct(
             steps=steps,
             estimated_time_minutes=estimated_time,
             automation_available=True
@@ -416,10 +566,12 @@ class Recommender:
     def validate_dependencies(self, workload: Workload) -> List[str]:
         dependencies = []
 
-        if "database" in workload.name.lower() or "db" in workload.name.lower():
+        tags = workload.workload_tags
+
+        if not tags.isdisjoint(_DATA_STORE_TAGS):
             dependencies.append("May have dependent applications")
 
-        if "api" in workload.name.lower() or "gateway" in workload.name.lower():
+        if not tags.isdisjoint(_CRITICAL_PATH_TAGS):
             dependencies.append("May be a critical path component")
 
         if workload.kind == "DaemonSet":
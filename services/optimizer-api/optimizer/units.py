@@ -0,0 +1,57 @@
+import re
+from functools import lru_cache
+
+_QUANTITY_RE = re.compile(r'^([0-9.]+)([a-zA-Z]*)$')
+
+_KI = 1024
+_MI = 1024 * 1024
+_GI = 1024 * 1024 * 1024
+
+_MEMORY_MULTIPLIERS = {
+    '': 1,
+    'Ki': _KI,
+    'Mi': _MI,
+    'Gi': _GI,
+    'K': 1000,
+    'M': 1000 * 1000,
+    'G': 1000 * 1000 * 1000
+}
+
+_CPU_DIVISORS = {
+    '': 1,
+    'm': 1000
+}
+
+
+def _split_quantity(value: str, units: dict):
+    match = _QUANTITY_RE.match(value)
+    if not match or match[2] not in units:
+        raise ValueError(f"Invalid resource quantity: {value!r}")
+    return float(match[1]), units[match[2]]
+
+
+@lru_cache(maxsize=4096)
+def parse_cpu(cpu_string: str) -> float:
+    number, divisor = _split_quantity(cpu_string, _CPU_DIVISORS)
+    return number / divisor
+
+
+@lru_cache(maxsize=4096)
+def parse_memory(memory_string: str) -> int:
+    number, multiplier = _split_quantity(memory_string, _MEMORY_MULTIPLIERS)
+    return int(number * multiplier)
+
+
+def format_cpu(cpu_cores: float) -> str:
+    if cpu_cores < 1:
+        return f"{int(cpu_cores * 1000)}m"
+    return f"{cpu_cores:.1f}"
+
+
+def format_memory(memory_bytes: int) -> str:
+    if memory_bytes < _MI:
+        return f"{memory_bytes // _KI}Ki"
+    elif memory_bytes < _GI:
+        return f"{memory_bytes // _MI}Mi"
+    else:
+        return f"{memory_bytes // _GI}Gi"
@@ -2,10 +2,10 @@
 
 import sys
 import json
+from collections import defaultdict
 from sample_data import (
     get_all_scenarios,
     get_total_savings,
-    get_by_optimization_type,
     AGGREGATE_SAVINGS,
     HIGH_CONFIDENCE_RECOMMENDATIONS,
     QUICK_WINS,
@@ -93,16 +93,17 @@ def main():
 
     print_separator("OPTIMIZATION BY TYPE")
 
-    opt_types = set()
+    workloads_by_type = defaultdict(int)
+    savings_by_type = defaultdict(float)
     for scenario in scenarios:
-        opt_types.update(scenario['optimization_types'])
+        for opt_type in scenario['optimization_types']:
+            workloads_by_type[opt_type] += 1
+            savings_by_type[opt_type] += scenario['cost_reduction']['savings']
 
-    for opt_type in sorted(opt_types):
-        matching = get_by_optimization_type(opt_type)
-        total_savings = sum(s['cost_reduction']['savings'] for s in matching)
+    for opt_type in sorted(workloads_by_type):
         print(f"{opt_type.replace('_', ' ').title()}")
-        print(f"  Workloads: {len(matching)}")
-        print(f"  Total Savings: ${total_savings:.2f}/month")
+        print(f"  Workloads: {workloads_by_type[opt_type]}")
+        print(f"  Total Savings: ${savings_by_type[opt_type]:.2f}/month")
         print()
 
     print_separator("MULTI-CLOUD COST COMPARISON")
@@ -5,6 +5,8 @@ This module contains test data showing realistic optimization scenarios
 across different workload types and optimization strategies.
 """
 
+from functools import lru_cache
+
 # Scenario 1: Over-provisioned web service
 OVERPROVISIONED_WEB_SERVICE = {
     "name": "frontend-web",
@@ -36,7 +38,7 @@ OVERPROVISIONED_WEB_SERVICE = {
         "savings": 438.00,
         "savings_percentage": 50.0
     },
-    "optimization_types": ["right_size_cpu", "right_size_memory"],
+    "optimization_types": ("right_size_cpu", "right_size_memory"),
     "confidence_score": 0.92
 }
 
@@ -67,7 +69,7 @@ EXCESSIVE_REPLICAS = {
         "savings": 438.00,
         "savings_percentage": 37.5
     },
-    "optimization_types": ["reduce_replicas"],
+    "optimization_types": ("reduce_replicas",),
     "confidence_score": 0.88
 }
 
@@ -92,7 +94,7 @@ SPOT_INSTANCE_CANDIDATE = {
         "savings": 2044.00,
         "savings_percentage": 70.0
     },
-    "optimization_types": ["spot_instances"],
+    "optimization_types": ("spot_instances",),
     "confidence_score": 0.85,
     "risk_level": "medium"
 }
@@ -122,7 +124,7 @@ UNUSED_DEV_ENV = {
         "savings": 657.00,
         "savings_percentage": 100.0
     },
-    "optimization_types": ["remove_unused"],
+    "optimization_types": ("remove_unused",),
     "confidence_score": 0.78
 }
 
@@ -149,7 +151,7 @@ SCHEDULED_SCALING_OPPORTUNITY = {
         "savings": 175.00,
         "savings_percentage": 40.0
     },
-    "optimization_types": ["scheduled_scaling"],
+    "optimization_types": ("scheduled_scaling",),
     "confidence_score": 0.82
 }
 
@@ -180,7 +182,7 @@ WRONG_INSTANCE_TYPE = {
         "savings": 65.00,
         "savings_percentage": 26.0
     },
-    "optimization_types": ["change_instance_type"],
+    "optimization_types": ("change_instance_type",),
     "confidence_score": 0.90
 }
 
@@ -207,19 +209,19 @@ OPTIMIZATION_DISTRIBUTION = {
 }
 
 # High-confidence recommendations (>0.85)
-HIGH_CONFIDENCE_RECOMMENDATIONS = [
+HIGH_CONFIDENCE_RECOMMENDATIONS = (
     OVERPROVISIONED_WEB_SERVICE,
     EXCESSIVE_REPLICAS,
     SPOT_INSTANCE_CANDIDATE,
     WRONG_INSTANCE_TYPE
-]
+)
 
 # Quick wins (high savings, low risk, high confidence)
-QUICK_WINS = [
+QUICK_WINS = (
     OVERPROVISIONED_WEB_SERVICE,
     EXCESSIVE_REPLICAS,
     WRONG_INSTANCE_TYPE
-]
+)
 
 # Multi-cloud comparison scenario
 MULTI_CLOUD_COMPARISON = {
@@ -250,41 +252,48 @@ MULTI_CLOUD_COMPARISON = {
     }
 }
 
+_SCENARIOS = (
+    OVERPROVISIONED_WEB_SERVICE,
+    EXCESSIVE_REPLICAS,
+    SPOT_INSTANCE_CANDIDATE,
+    UNUSED_DEV_ENV,
+    SCHEDULED_SCALING_OPPORTUNITY,
+    WRONG_INSTANCE_TYPE
+)
+
+# the scenarios are static, so their totals are summed once at import
+_TOTAL_CURRENT = sum(s["cost_reduction"]["current_monthly"] for s in _SCENARIOS)
+_TOTAL_OPTIMIZED = sum(s["cost_reduction"]["optimized_monthly"] for s in _SCENARIOS)
+
+# scenarios indexed by each optimization type they demonstrate
+_BY_TYPE = {}
+for _scenario in _SCENARIOS:
+    for _opt_type in _scenario.get("optimization_types", ()):
+        _BY_TYPE.setdefault(_opt_type, []).append(_scenario)
+
+
 def get_all_scenarios():
     """Return all optimization scenarios"""
-    return [
-        OVERPROVISIONED_WEB_SERVICE,
-        EXCESSIVE_REPLICAS,
-        SPOT_INSTANCE_CANDIDATE,
-        UNUSED_DEV_ENV,
-        SCHEDULED_SCALING_OPPORTUNITY,
-        WRONG_INSTANCE_TYPE
-    ]
+    return list(_SCENARIOS)
 
 
+@lru_cache(maxsize=1)
 def get_total_savings():
     """Calculate total potential savings across all scenarios"""
-    scenarios = get_all_scenarios()
-    total_current = sum(s["cost_reduction"]["current_monthly"] for s in scenarios)
-    total_optimized = sum(s["cost_reduction"]["optimized_monthly"] for s in scenarios)
-    total_savings = total_current - total_optimized
+    total_savings = _TOTAL_CURRENT - _TOTAL_OPTIMIZED
 
     return {
-        "total_current_monthly": total_current,
-        "total_optimized_monthly": total_optimized,
+        "total_current_monthly": _TOTAL_CURRENT,
+        "total_optimized_monthly": _TOTAL_OPTIMIZED,
         "total_monthly_savings": total_savings,
         "total_yearly_savings": total_savings * 12,
-        "savings_percentage": (total_savings / total_current * 100) if total_current > 0 else 0
+        "savings_percentage": (total_savings / _TOTAL_CURRENT * 100) if _TOTAL_CURRENT > 0 else 0
     }
 
 
 def get_by_optimization_type(opt_type: str):
     """Get scenarios filtered by optimization type"""
-    scenarios = get_all_scenarios()
-    return [
-        s for s in scenarios
-        if opt_type in s.get("optimization_types", [])
-    ]
+    return list(_BY_TYPE.get(opt_type, ()))
 
 
 if __name__ == "__main__":
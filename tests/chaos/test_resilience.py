@@ -10,15 +10,24 @@ Tests system behavior under failure conditions:
 
 import pytest
 import asyncio
-from kubernetes import client, config
+from kubernetes import watch
 import time
 
 
-@pytest.fixture
-def k8s_client():
-    """Create Kubernetes client."""
-    config.load_kube_config()
-    return client.CoreV1Api()
+def wait_for_replacement_pod(k8s_client, namespace, label_selector, existing_pod_names, timeout_seconds=30):
+    """Block until a pod not in existing_pod_names reports Running, or the watch times out."""
+    w = watch.Watch()
+    for event in w.stream(
+        k8s_client.list_namespaced_pod,
+        namespace=namespace,
+        label_selector=label_selector,
+        timeout_seconds=timeout_seconds
+    ):
+        pod = event["object"]
+        if pod.metadata.name not in existing_pod_names and pod.status.phase == "Running":
+            w.stop()
+            return True
+    return False
 
 
 class TestPodResilience:
@@ -41,6 +50,7 @@ class TestPodResilience:
             pytest.skip("No API pods found")
 
         pod_name = pods.items[0].metadata.name
+        existing_pod_names = {p.metadata.name for p in pods.items}
 
         # Delete pod (simulate crash)
         k8s_client.delete_namespaced_pod(
@@ -48,8 +58,15 @@ class TestPodResilience:
             namespace=namespace
         )
 
-        # Wait for new pod to be ready
-        await asyncio.sleep(30)
+        # Wait for the replacement pod, not a surviving replica, to be ready
+        replaced = await asyncio.to_thread(
+            wait_for_replacement_pod,
+            k8s_client,
+            namespace,
+            f"app={deployment_name}",
+            existing_pod_names
+        )
+        assert replaced, "No replacement API pod reached Running"
 
         # Verify new pod is running
         new_pods = k8s_client.list_namespaced_pod(
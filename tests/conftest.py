@@ -4,6 +4,7 @@ Shared pytest fixtures and utilities for all tests.
 
 import pytest
 import asyncio
+import functools
 from typing import AsyncGenerator, Dict, Any
 import os
 import tempfile
@@ -117,6 +118,10 @@ def mock_pricing_data() -> Dict[str, Any]:
 # Database fixtures
 # ==============================================================================
 
+# one statement truncates every table atomically in a single round trip
+_TRUNCATE_TEST_TABLES = 'TRUNCATE TABLE recommendations, analyses, daily_costs RESTART IDENTITY CASCADE'
+
+
 @pytest.fixture
 async def db_connection(test_config):
     """Create database connection for tests."""
@@ -131,16 +136,12 @@ async def db_connection(test_config):
 async def clean_database(db_connection):
     """Clean database before and after tests."""
     # Clean before test
-    await db_connection.execute('TRUNCATE TABLE recommendations CASCADE')
-    await db_connection.execute('TRUNCATE TABLE analyses CASCADE')
-    await db_connection.execute('TRUNCATE TABLE daily_costs CASCADE')
+    await db_connection.execute(_TRUNCATE_TEST_TABLES)
 
     yield
 
     # Clean after test
-    await db_connection.execute('TRUNCATE TABLE recommendations CASCADE')
-    await db_connection.execute('TRUNCATE TABLE analyses CASCADE')
-    await db_connection.execute('TRUNCATE TABLE daily_costs CASCADE')
+    await db_connection.execute(_TRUNCATE_TEST_TABLES)
 
 
 # ==============================================================================
@@ -162,12 +163,15 @@ async def redis_client(test_config):
 # API fixtures
 # ==============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 async def api_client(test_config):
-    """Create HTTP client for API tests."""
+    """Create HTTP client for API tests, shared across the session."""
     import httpx
 
-    async with httpx.AsyncClient(base_url=test_config['api_url']) as client:
+    async with httpx.AsyncClient(
+        base_url=test_config['api_url'],
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30)
+    ) as client:
         yield client
 
 
@@ -175,21 +179,29 @@ async def api_client(test_config):
 # Kubernetes fixtures
 # ==============================================================================
 
-@pytest.fixture
+@functools.lru_cache(maxsize=None)
+def _load_kube_once():
+    """Load the kubeconfig once per session."""
+    from kubernetes import config
+
+    config.load_kube_config()
+
+
+@pytest.fixture(scope="session")
 def k8s_client():
     """Create Kubernetes client."""
-    from kubernetes import client, config
+    from kubernetes import client
 
-    config.load_kube_config()
+    _load_kube_once()
     return client.CoreV1Api()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def k8s_apps_client():
     """Create Kubernetes Apps API client."""
-    from kubernetes import client, config
+    from kubernetes import client
 
-    config.load_kube_config()
+    _load_kube_once()
     return client.AppsV1Api()
 
 
@@ -197,6 +209,7 @@ def k8s_apps_client():
 # Helper functions
 # ==============================================================================
 
+@functools.lru_cache(maxsize=256)
 def parse_resource(resource_str: str, resource_type: str = 'cpu') -> float:
     """Parse Kubernetes resource string to numeric value."""
     if resource_type == 'cpu':
@@ -243,6 +256,7 @@ def pytest_configure(config):
 def pytest_collection_modifyitems(config, items):
     """Modify test collection based on available services."""
     import socket
+    from concurrent.futures import ThreadPoolExecutor
 
     def check_service(host, port):
         """Check if service is available."""
@@ -255,10 +269,12 @@ def pytest_collection_modifyitems(config, items):
         except:
             return False
 
-    # Check for services
-    postgres_available = check_service('localhost', 5432)
-    redis_available = check_service('localhost', 6379)
-    api_available = check_service('localhost', 8000)
+    # Check for services concurrently so unreachable ones share a single timeout
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        postgres_available, redis_available, api_available = executor.map(
+            lambda address: check_service(*address),
+            [('localhost', 5432), ('localhost', 6379), ('localhost', 8000)]
+        )
 
     skip_postgres = pytest.mark.skip(reason="PostgreSQL not available")
     skip_redis = pytest.mark.skip(reason="Redis not available")
@@ -4,18 +4,12 @@ Integration tests for API endpoints.
 Tests all REST API endpoints with real database and services.
 """
 
+import asyncio
+import json
 import pytest
-import httpx
 from datetime import datetime, timedelta
 
 
-@pytest.fixture
-async def api_client():
-    """Create test API client."""
-    async with httpx.AsyncClient(base_url='http://localhost:8000') as client:
-        yield client
-
-
 class TestAnalysisAPI:
     """Test analysis API endpoints."""
 
@@ -75,12 +69,14 @@ class TestRecommendationsAPI:
         list_response = await api_client.get('/api/v1/recommendations')
         recommendations = list_response.json()['recommendations']
 
-        if len(recommendations) > 0:
-            rec_id = recommendations[0]['id']
-
-            # Get details
-            response = await api_client.get(f'/api/v1/recommendations/{rec_id}')
+        # Get details for the first few concurrently; the lookups are independent
+        rec_ids = [rec['id'] for rec in recommendations[:5]]
+        responses = await asyncio.gather(*[
+            api_client.get(f'/api/v1/recommendations/{rec_id}')
+            for rec_id in rec_ids
+        ])
 
+        for rec_id, response in zip(rec_ids, responses):
             assert response.status_code == 200
             data = response.json()
             assert data['id'] == rec_id
@@ -208,7 +204,7 @@ class TestWebSocketAPI:
 
             # Receive updates
             update = await ws.recv()
-            data = eval(update)  # In real test, use json.loads
+            data = json.loads(update)
 
             assert 'status' in data
             assert 'progress' in data